@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from LoadTracker.staticfiles import ASGIPrecompressedStaticFilesHandler
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LoadTracker.settings')
 
+# ASGI profile: route the htmx partials to the async views. Run with an ASGI
+# server, e.g. `uvicorn LoadTracker.asgi:application --workers 2`; compare
+# against WSGI with `python manage.py bench_partials`. Keep DB_CONNECTION_MODE at
+# pgbouncer or pool here: persistent connections are per thread under ASGI.
+os.environ.setdefault('ASYNC_PARTIALS', 'True')
+
 application = get_asgi_application()
+
+if settings.SERVE_STATIC:
+    application = ASGIPrecompressedStaticFilesHandler(application)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import dj_database_url
 import os
@@ -54,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First and last: no-ops unless REQUEST_TIMING or QUERY_INSPECTOR is on
+    'clientside.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     "django_htmx.middleware.HtmxMiddleware",
@@ -65,6 +68,7 @@ MIDDLEWARE = [
 
     'django_auto_logout.middleware.auto_logout',
 
+    'clientside.middleware.ViewTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'LoadTracker.urls'
@@ -90,6 +94,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'LoadTracker.wsgi.application'
 
+# Serve the htmx partial endpoints with the async views in clientside.async_views.
+# LoadTracker/asgi.py turns this on; under WSGI the sync views stay faster.
+ASYNC_PARTIALS = os.getenv('ASYNC_PARTIALS', 'False') == 'True'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -107,14 +115,45 @@ DATABASES = {
 
 
 
+# Connection handling, picked with DB_CONNECTION_MODE:
+#   pgbouncer  - new connection per request, pooling left to pgBouncer (default)
+#   persistent - keep connections for DB_CONN_MAX_AGE seconds, health-checked before reuse
+#   pool       - in-process psycopg pool (Django 5.1+, needs "psycopg[pool]", which
+#                requirements.txt does not ship: it pins psycopg2)
+# Compare them with: python manage.py bench_connections
+
+DB_CONNECTION_MODE = os.getenv('DB_CONNECTION_MODE', 'pgbouncer')
+
 DATABASES = {
     "default": dj_database_url.config(
         default=os.environ.get("DATABASE_URL"),
         conn_max_age=0,        # required for pgBouncer
-        ssl_require=True
+        ssl_require=os.getenv('DB_SSL_REQUIRE', 'True') == 'True'
     )
 }
 
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+elif DB_CONNECTION_MODE == 'pool':
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            "DB_CONNECTION_MODE=pool needs psycopg 3 and its pool: pip install 'psycopg[pool]'. "
+            "requirements.txt only ships psycopg2; use DB_CONNECTION_MODE=pgbouncer or persistent instead."
+        )
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        "max_size": int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        "timeout": int(os.getenv('DB_POOL_TIMEOUT', '10')),
+    }
+
+# Trigram lookups for client search (Client.objects.search); SQLite uses a LIKE fallback
+if DATABASES["default"].get("ENGINE") == "django.db.backends.postgresql":
+    INSTALLED_APPS.append('django.contrib.postgres')
+
 
 
 
@@ -157,6 +196,11 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Let the app server itself answer /static/ (LoadTracker/wsgi.py, asgi.py) when no
+# web server sits in front, as in the branch-office gunicorn setup (run.sh). Pre-gzipped
+# assets (export_locations) are sent gzipped; a front proxy must do that itself.
+SERVE_STATIC = os.getenv('SERVE_STATIC', 'True') == 'True'
+
 
 
 # Default primary key field type
@@ -165,11 +209,66 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Dashboard rows: 'worklist' reads the precomputed WorklistEntry table (build_worklists),
+# 'stored' reads Number.running_balance live,
+# 'ledger' recomputes from Invoice / Payment rows with SQL subqueries
+
+DASHBOARD_BALANCE_SOURCE = os.getenv('DASHBOARD_BALANCE_SOURCE', 'worklist')
+
+
+# Per-request SQL / view / template timing (clientside.middleware): Server-Timing
+# headers, one JSON line per request on the "clientside.timing" logger and per-URL
+# aggregates at /stats/requests/ for staff. Off: the middleware removes itself.
+
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', 'False') == 'True'
+
+# Query inspector for development / staging (clientside.queries): records every
+# statement per request, flags query shapes repeated QUERY_INSPECTOR_REPEAT times or
+# more at one call site, EXPLAINs statements slower than QUERY_INSPECTOR_SLOW_MS and
+# logs a per-request report on "clientside.queries" (also at /stats/queries/ for staff).
+# Adds a stack capture per statement: not for production traffic.
+
+QUERY_INSPECTOR = os.getenv('QUERY_INSPECTOR', 'False') == 'True'
+QUERY_INSPECTOR_REPEAT = int(os.getenv('QUERY_INSPECTOR_REPEAT', '3'))
+QUERY_INSPECTOR_SLOW_MS = float(os.getenv('QUERY_INSPECTOR_SLOW_MS', '100'))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "clientside.timing": {
+            "handlers": ["console"],
+            "level": os.getenv('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            "propagate": False,
+        },
+        "clientside.queries": {
+            "handlers": ["console"],
+            "level": os.getenv('QUERY_INSPECTOR_LOG_LEVEL', 'WARNING'),
+            "propagate": False,
+        },
+        "clientside.health": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+
 # Auto Logout and Rate Limiter Cache
+# On disk, so every gunicorn worker and every management command on this host sees the
+# same entries: dashboard / location version stamps bumped by one process must reach
+# the others, and login lockouts must not reset per worker. CACHE_DIR must be writable
+# by the app user and not shared with anything else (clear() empties it).
 
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv('CACHE_DIR', str(BASE_DIR / '.cache')),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv('CACHE_MAX_ENTRIES', '10000'))},
     }
 }
 
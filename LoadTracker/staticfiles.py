@@ -0,0 +1,37 @@
+"""
+Static file handlers that answer with a pre-compressed copy when there is one.
+
+export_locations writes locations.<version>.json next to a .json.gz of it. Django's
+StaticFilesHandler only ever serves the file that was asked for, so with
+SERVE_STATIC on these handlers send the .gz (Content-Encoding: gzip) to clients
+that accept it. Behind nginx or another front proxy, turn SERVE_STATIC off and
+let the proxy do the same (e.g. nginx `gzip_static on;`).
+"""
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler, StaticFilesHandler
+from django.contrib.staticfiles.views import serve
+from django.utils.cache import patch_vary_headers
+
+
+class PrecompressedMixin:
+
+    def serve(self, request):
+        path = self.file_path(request.path)
+        if not finders.find(f"{path}.gz"):
+            return super().serve(request)
+
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            # Content-Type comes from the .json; serve() adds Content-Encoding for .gz
+            response = serve(request, f"{path}.gz", insecure=True)
+        else:
+            response = super().serve(request)
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+
+class PrecompressedStaticFilesHandler(PrecompressedMixin, StaticFilesHandler):
+    pass
+
+
+class ASGIPrecompressedStaticFilesHandler(PrecompressedMixin, ASGIStaticFilesHandler):
+    pass
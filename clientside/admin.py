@@ -1,3 +1,16 @@
 from django.contrib import admin
 
+from .models import Operator, NumberOperatorIdentifier
+
 # Register your models here.
+
+@admin.register(Operator)
+class OperatorAdmin(admin.ModelAdmin):
+    list_display = ["name"]
+
+
+@admin.register(NumberOperatorIdentifier)
+class NumberOperatorIdentifierAdmin(admin.ModelAdmin):
+    list_display = ["number", "operator"]
+    list_select_related = ["operator"]
+    search_fields = ["number"]
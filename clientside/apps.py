@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ClientsideConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clientside'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Before any connection opens, so every thread's connection gets the SQL hook
+        if settings.REQUEST_TIMING or settings.QUERY_INSPECTOR:
+            from .timing import install_hooks
+            install_hooks()
@@ -0,0 +1,96 @@
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.template.loader import render_to_string
+from django.views.decorators.cache import cache_control
+
+from .history import plan_history_page
+from .locations import LOCATION_MAX_AGE, alocation_condition, alocation_fragment, location_parent_id
+from .models import Number
+from .views import CLIENTS_PER_PAGE, client_portfolio_query, plan_number_results
+
+
+# Async versions of the htmx partial endpoints, routed instead of the sync ones
+# when ASYNC_PARTIALS is on (the ASGI profile in LoadTracker/asgi.py).
+# Queries are built by the same helpers as the sync views and fetched with the
+# async ORM. The partial templates need no request context, so they are
+# rendered with render_to_string() and never touch request.user lazily.
+
+
+def reuse_loaded_user(view):
+    """
+    AuthenticationMiddleware caches request.user and request.auser() separately,
+    and django_auto_logout has already loaded the sync one by the time the view
+    runs. Hand that user to the async cache so login_required doesn't fetch it again.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if hasattr(request, "_cached_user") and not hasattr(request, "_acached_user"):
+            request._acached_user = request._cached_user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def hx_history_table(request, number_id):
+    number = await aget_object_or_404(Number, id=number_id)
+
+    query, finish = plan_history_page(number, request.GET)
+    rows = [row async for row in query]
+
+    return HttpResponse(render_to_string('payments/payment_invoice_history.html', {
+        **finish(rows),
+        'number': number,
+    }))
+
+
+@reuse_loaded_user
+@login_required(login_url='login')
+async def search_number_page(request):
+    user = await request.auser()
+    page, count_query, finish = plan_number_results(user, request.GET)
+
+    total = await count_query.acount() if count_query is not None else None
+    template, context = finish([n async for n in page], total)
+    return HttpResponse(render_to_string(template, context))
+
+
+@reuse_loaded_user
+@login_required(login_url='login')
+async def search_clients(request):
+    user = await request.auser()
+    clients, search = client_portfolio_query(user, request.GET)
+
+    paginator = Paginator(clients, CLIENTS_PER_PAGE)
+    paginator.count = await clients.acount()     # get_page() would count synchronously
+    page_obj = paginator.get_page(request.GET.get("page", 1))
+    page_obj.object_list = [client async for client in page_obj.object_list]
+
+    return HttpResponse(render_to_string("client/partials/client_list.html", {
+        "clients": page_obj.object_list,
+        "page_obj": page_obj,
+        "search": search,
+    }))
+
+
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@alocation_condition("provinces", "region")
+async def load_provinces(request):
+    region_id = location_parent_id(request.GET.get("region"))
+    return HttpResponse(await alocation_fragment("provinces", region_id))
+
+
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@alocation_condition("municipalities", "province")
+async def load_municipalities(request):
+    province_id = location_parent_id(request.GET.get("province"))
+    return HttpResponse(await alocation_fragment("municipalities", province_id))
+
+
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@alocation_condition("barangays", "municipality")
+async def load_barangays(request):
+    municipality_id = location_parent_id(request.GET.get("municipality"))
+    return HttpResponse(await alocation_fragment("barangays", municipality_id))
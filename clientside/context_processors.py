@@ -1,14 +1,9 @@
 # your_app/context_processors.py
-from django.db import connection
-from django.db.utils import OperationalError
+from .health import database_health
+
 
 def database_connection_status(request):
-    db_connected = True
-    try:
-        connection.ensure_connection()
-    except OperationalError:
-        db_connected = False
-    
+    # Cached result of the background probe; no database work per render
     return {
-        'db_connected': db_connected
-    }
\ No newline at end of file
+        'db_connected': database_health.status()['connected']
+    }
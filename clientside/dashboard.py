@@ -0,0 +1,112 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Client, Number
+from .worklists import dashboard_worklist
+
+
+# Rendered dashboard card lists, cached per user / date / collection day / show_all.
+# Every key embeds the user's version stamp; clientside.signals bump it whenever an
+# Invoice, Payment, Number, Client or Handler of that user changes, so stale
+# fragments are never read again and simply expire. The stamps only work because
+# CACHES is shared between processes: an import_ledger / rebuild_balances run or
+# another gunicorn worker bumps the same key the serving worker reads.
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24     # keys carry the date, so a day is enough
+
+
+def dashboard_version_key(user_id):
+    return f"dashboard:version:{user_id}"
+
+
+def dashboard_version(user_id):
+    key = dashboard_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_dashboard(user_ids):
+    # Bumped after commit, so a concurrent render cannot re-cache pre-commit data
+    keys = [dashboard_version_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def invalidate_dashboard_for_numbers(number_ids):
+    invalidate_dashboard(
+        Number.objects.filter(pk__in=number_ids).values_list("client__user_client_id", flat=True)
+    )
+
+
+def invalidate_dashboard_for_clients(client_ids):
+    invalidate_dashboard(
+        Client.objects.filter(pk__in=client_ids).values_list("user_client_id", flat=True)
+    )
+
+
+class DashboardCacheStats:
+    """
+    Fragment cache hits and misses for this process; each gunicorn worker keeps its own.
+    Counted in memory, since writing them to CACHES on every dashboard view would cost
+    a cache write (and a directory scan on the file cache) per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, cached):
+        with self._lock:
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+dashboard_cache_stats = DashboardCacheStats()
+
+
+def dashboard_cards(user, today, selected_day, show_all):
+    """
+    Rendered card list for the dashboard and whether it came from the cache.
+    """
+    key = (
+        f"dashboard:{user.pk}:{dashboard_version(user.pk)}:"
+        f"{today.isoformat()}:{selected_day}:{int(show_all)}"
+    )
+
+    html = cache.get(key)
+    if html is not None:
+        dashboard_cache_stats.count(True)
+        return mark_safe(html), True
+
+    html = render_to_string("client/partials/dashboard_cards.html", {
+        "numbers": dashboard_worklist(user, selected_day, show_all),
+        "selected_day": selected_day,
+    })
+    cache.set(key, html, DASHBOARD_CACHE_TIMEOUT)
+    dashboard_cache_stats.count(False)
+    return mark_safe(html), False
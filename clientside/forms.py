@@ -5,16 +5,13 @@ from django.forms.widgets import PasswordInput, TextInput
 from .models import (
     Client,
     Address,
-    Region,
-    Province,
-    Municipality,
-    Barangay,
     Handler,
     Number,
     Payment,
     Invoice,
     )
 from django.core.exceptions import ValidationError
+from .locations import location_index
 
 class LoginForm(AuthenticationForm):
     username = forms.CharField(widget=TextInput())
@@ -23,10 +20,11 @@ class LoginForm(AuthenticationForm):
 
 class CreateClientForm(forms.ModelForm):
     # Extra address fields — NOT part of Client model
-    region = forms.ModelChoiceField(queryset=Region.objects.all(), required=False)
-    province = forms.ModelChoiceField(queryset=Province.objects.all(), required=False)
-    municipality = forms.ModelChoiceField(queryset=Municipality.objects.all(), required=False)
-    barangay = forms.ModelChoiceField(queryset=Barangay.objects.all(), required=False)
+    # Plain ids, validated against the in-memory location index in clean()
+    region = forms.IntegerField(required=False)
+    province = forms.IntegerField(required=False)
+    municipality = forms.IntegerField(required=False)
+    barangay = forms.IntegerField(required=False)
 
     house_number_street = forms.CharField(
         max_length=255,
@@ -62,10 +60,10 @@ class CreateClientForm(forms.ModelForm):
         if self.instance and self.instance.pk and self.instance.primary_address:
             addr = self.instance.primary_address
             self.fields["house_number_street"].initial = addr.house_number_street
-            self.fields["region"].initial = addr.region
-            self.fields["province"].initial = addr.province
-            self.fields["municipality"].initial = addr.municipality
-            self.fields["barangay"].initial = addr.barangay
+            self.fields["region"].initial = addr.region_id
+            self.fields["province"].initial = addr.province_id
+            self.fields["municipality"].initial = addr.municipality_id
+            self.fields["barangay"].initial = addr.barangay_id
 
     def clean_contact_number(self):
         cn = self.cleaned_data.get("contact_number")
@@ -80,13 +78,28 @@ class CreateClientForm(forms.ModelForm):
         municipality = cleaned.get("municipality")
         barangay = cleaned.get("barangay")
 
-        if province and region and province.region != region:
+        for field, level, value in (
+            ("region", "regions", region),
+            ("province", "provinces", province),
+            ("municipality", "municipalities", municipality),
+            ("barangay", "barangays", barangay),
+        ):
+            if value is not None and not location_index.exists(level, value):
+                self.add_error(field, "Select a valid choice. That choice is not one of the available choices.")
+                cleaned[field] = None
+
+        region = cleaned.get("region")
+        province = cleaned.get("province")
+        municipality = cleaned.get("municipality")
+        barangay = cleaned.get("barangay")
+
+        if province and region and location_index.parent("provinces", province) != region:
             self.add_error("province", "Selected province does not belong to selected region.")
 
-        if municipality and province and municipality.province != province:
+        if municipality and province and location_index.parent("municipalities", municipality) != province:
             self.add_error("municipality", "Selected municipality does not belong to selected province.")
 
-        if barangay and municipality and barangay.municipality != municipality:
+        if barangay and municipality and location_index.parent("barangays", barangay) != municipality:
             self.add_error("barangay", "Selected barangay does not belong to selected municipality.")
 
         return cleaned
@@ -114,17 +127,17 @@ class CreateClientForm(forms.ModelForm):
         # Reuse or create Address
         if self.instance and getattr(self.instance, "primary_address", None):
             address = self.instance.primary_address
-            address.region = region
-            address.province = province
-            address.municipality = municipality
-            address.barangay = barangay
+            address.region_id = region
+            address.province_id = province
+            address.municipality_id = municipality
+            address.barangay_id = barangay
             address.house_number_street = house_number_street
         else:
             address = Address(
-                region=region,
-                province=province,
-                municipality=municipality,
-                barangay=barangay,
+                region_id=region,
+                province_id=province,
+                municipality_id=municipality,
+                barangay_id=barangay,
                 house_number_street=house_number_street,
             )
 
@@ -153,7 +166,20 @@ class AddNumberForm(forms.ModelForm):
 
         # Filter handlers belonging to this client only
         if client:
-            self.fields['handler'].queryset = Handler.objects.filter(client_handler=client)
+            # Handler.__str__ shows the trade name, so fetch the client with each choice
+            self.fields['handler'].queryset = Handler.objects.filter(client_handler=client).select_related('client_handler')
+
+
+class NumberImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV or XLSX with columns: number, handler, collection_day, sim_status (optional)"
+    )
+
+    def clean_file(self):
+        f = self.cleaned_data["file"]
+        if not f.name.lower().endswith((".csv", ".xlsx")):
+            raise ValidationError("Upload a .csv or .xlsx file.")
+        return f
 
 
 class InvoiceForm(forms.ModelForm):
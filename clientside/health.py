@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.db.utils import DatabaseError
+
+
+# Database health, probed off the request path.
+# A daemon thread runs "SELECT 1" every HEALTH_PROBE_INTERVAL seconds on its own
+# connection; templates and views only ever read the last result.
+
+HEALTH_PROBE_INTERVAL = 30     # seconds between background probes
+HEALTH_TTL = 60                # a result older than this is considered stale
+
+logger = logging.getLogger("clientside.health")
+
+
+class DatabaseHealth:
+
+    def __init__(self, alias="default", interval=HEALTH_PROBE_INTERVAL, ttl=HEALTH_TTL):
+        self.alias = alias
+        self.interval = interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._thread = None
+        self._status = {
+            "connected": True,       # optimistic until the first probe says otherwise
+            "latency_ms": None,
+            "checked_at": None,
+            "error": None,
+        }
+
+    def probe(self, close=True):
+        """
+        Run one round trip and record the result.
+
+        The background thread closes its connection afterwards; request code passes
+        close=False so the request's own connection (and transaction) is left alone.
+        """
+        connection = connections[self.alias]
+        started = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            status = {
+                "connected": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                "error": None,
+            }
+        except DatabaseError as e:
+            # The error text names hosts and users; it goes to the log, never to /healthz
+            logger.warning("Database health probe on '%s' failed: %s", self.alias, str(e).strip())
+            status = {"connected": False, "latency_ms": None, "error": str(e).strip()}
+        finally:
+            if close:
+                connection.close()
+
+        status["checked_at"] = time.time()
+        with self._lock:
+            self._status = status
+        return dict(status)
+
+    def status(self):
+        """Last probe result; never touches the database."""
+        self.start()
+        with self._lock:
+            status = dict(self._status)
+        status["stale"] = status["checked_at"] is None or time.time() - status["checked_at"] > self.ttl
+        return status
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-health-probe", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.probe()
+            time.sleep(self.interval)
+
+
+database_health = DatabaseHealth()
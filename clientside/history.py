@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+
+from django.db.models import F, Q, Value, CharField
+from django.utils import timezone
+
+from .models import Invoice, Payment
+
+
+# Merged invoice / payment history of a number, built as one UNION ALL queryset
+# so filtering, ordering and slicing all happen in the database.
+
+HISTORY_COLUMNS = ("id", "type", "time", "amount", "reference")
+
+HISTORY_PAGE_SIZE = 10
+
+# sort key -> (ORDER BY, keyset-paginated)
+HISTORY_SORTS = {
+    "time_desc": (("-time", "-type", "-id"), True),
+    "time_asc": (("time", "type", "id"), True),
+    "amount_desc": (("-amount", "-time", "-type", "-id"), False),
+    "amount_asc": (("amount", "time", "type", "id"), False),
+    "type_desc": (("-type", "-time", "-id"), False),
+    "type_asc": (("type", "-time", "-id"), False),
+}
+
+
+def parse_history_search_date(search):
+    # "2025", "2025-11", "2025-11-28" or "11/28/2025" -> aware [start, end) range
+    for fmt, unit in (("%Y-%m-%d", "day"), ("%m/%d/%Y", "day"), ("%Y-%m", "month"), ("%Y", "year")):
+        try:
+            start = datetime.strptime(search, fmt)
+        except ValueError:
+            continue
+
+        if unit == "day":
+            end = start + timedelta(days=1)
+        elif unit == "month":
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        else:
+            end = start.replace(year=start.year + 1)
+
+        return timezone.make_aware(start), timezone.make_aware(end)
+
+    return None
+
+
+def keyset_filter(queryset, row_type, cursor, descending):
+    # Rows strictly after cursor (time, type, id) in the given direction;
+    # row_type is constant per side, so the tuple comparison reduces to time / id.
+    time, cursor_type, cursor_id = cursor
+    before = row_type < cursor_type if descending else row_type > cursor_type
+
+    if row_type == cursor_type:
+        if descending:
+            return queryset.filter(Q(time__lt=time) | Q(time=time, id__lt=cursor_id))
+        return queryset.filter(Q(time__gt=time) | Q(time=time, id__gt=cursor_id))
+
+    if before:
+        return queryset.filter(time__lte=time) if descending else queryset.filter(time__gte=time)
+    return queryset.filter(time__lt=time) if descending else queryset.filter(time__gt=time)
+
+
+def build_history_queryset(number, search="", start=None, end=None, cursor=None, descending=True):
+    # Invoice / payment rows of one number as a single UNION ALL queryset of dicts
+    invoices = Invoice.objects.filter(number=number).annotate(
+        type=Value("Invoice", output_field=CharField()),
+        amount=F("balance"),
+        reference=F("reference_number"),
+    )
+    payments = Payment.objects.filter(number=number).annotate(
+        type=Value("Payment", output_field=CharField()),
+        amount=F("paid_amount"),
+        reference=F("reference_number"),
+    )
+
+    if start:
+        invoices = invoices.filter(time__gte=start)
+        payments = payments.filter(time__gte=start)
+    if end:
+        invoices = invoices.filter(time__lte=end)
+        payments = payments.filter(time__lte=end)
+
+    if search:
+        date_range = parse_history_search_date(search)
+        if date_range:
+            in_range = Q(time__gte=date_range[0], time__lt=date_range[1])
+            invoices = invoices.filter(in_range | Q(reference_number__icontains=search))
+            payments = payments.filter(in_range | Q(reference_number__icontains=search))
+        else:
+            invoices = invoices.filter(reference_number__icontains=search)
+            payments = payments.filter(reference_number__icontains=search)
+
+    if cursor:
+        invoices = keyset_filter(invoices, "Invoice", cursor, descending)
+        payments = keyset_filter(payments, "Payment", cursor, descending)
+
+    return invoices.values(*HISTORY_COLUMNS).union(
+        payments.values(*HISTORY_COLUMNS), all=True
+    )
+
+
+def encode_history_cursor(row):
+    return f"{row['time'].isoformat()}~{row['type']}~{row['id']}"
+
+
+def decode_history_cursor(value):
+    try:
+        time, row_type, row_id = value.split("~")
+        return datetime.fromisoformat(time), row_type, int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def reverse_ordering(ordering):
+    return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+
+def plan_history_page(number, params, page_size=HISTORY_PAGE_SIZE):
+    """
+    One page of the history table for the search / sort / cursor in ``params``.
+
+    Returns the sliced queryset and a function that turns its fetched rows into
+    the template context. Nothing is queried here, so sync views can fetch with
+    list() and async views with ``async for``.
+    """
+    search = params.get('search', '').strip()
+    sort = params.get('sort', 'time_desc')
+    if sort not in HISTORY_SORTS:
+        sort = 'time_desc'
+
+    ordering, keyset = HISTORY_SORTS[sort]
+    descending = ordering[0].startswith("-")
+
+    page = {"has_previous": False, "has_next": False, "after": "", "before": "", "number": 1}
+
+    if keyset:
+        # --- KEYSET PAGINATION (time-ordered) ---
+        after = decode_history_cursor(params.get("after"))
+        before = decode_history_cursor(params.get("before"))
+
+        if before:
+            history = build_history_queryset(number, search, cursor=before, descending=not descending)
+            query = history.order_by(*reverse_ordering(ordering))[:page_size + 1]
+        else:
+            history = build_history_queryset(number, search, cursor=after, descending=descending)
+            query = history.order_by(*ordering)[:page_size + 1]
+
+        def finish(rows):
+            if before:
+                page["has_previous"] = len(rows) > page_size
+                page["has_next"] = True
+                rows = rows[:page_size][::-1]
+            else:
+                page["has_previous"] = after is not None
+                page["has_next"] = len(rows) > page_size
+                rows = rows[:page_size]
+
+            if rows:
+                page["before"] = encode_history_cursor(rows[0])
+                page["after"] = encode_history_cursor(rows[-1])
+            return {'rows': rows, 'page': page, 'keyset': keyset, 'sort': sort, 'search': search}
+    else:
+        # --- OFFSET PAGINATION (amount / type) ---
+        try:
+            page_number = max(int(params.get("page", 1)), 1)
+        except ValueError:
+            page_number = 1
+
+        offset = (page_number - 1) * page_size
+        query = build_history_queryset(number, search).order_by(*ordering)[offset:offset + page_size + 1]
+
+        def finish(rows):
+            page["number"] = page_number
+            page["has_previous"] = page_number > 1
+            page["has_next"] = len(rows) > page_size
+            return {'rows': rows[:page_size], 'page': page, 'keyset': keyset, 'sort': sort, 'search': search}
+
+    return query, finish
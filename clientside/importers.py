@@ -0,0 +1,309 @@
+import csv
+import io
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from .models import Number, Handler, Invoice, Payment
+from .operators import normalize_number, prefix_resolver
+from .dashboard import invalidate_dashboard, invalidate_dashboard_for_numbers
+from .worklists import refresh_worklists
+
+
+# Bulk onboarding from CSV / XLSX files.
+# Rows are streamed, validated and inserted in batches; bad rows are reported
+# back instead of aborting the whole file.
+
+IMPORT_BATCH_SIZE = 1000
+
+
+def read_rows(file, filename):
+    """Yield (row_number, dict) pairs from a CSV or XLSX file; header names are lower-cased."""
+    if filename.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("XLSX import requires the openpyxl package; upload a CSV instead.")
+
+        sheet = load_workbook(file, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, [])]
+        for row_number, values in enumerate(rows, start=2):
+            if any(v not in (None, "") for v in values):
+                yield row_number, {
+                    key: "" if value is None else str(value).strip()
+                    for key, value in zip(header, values)
+                }
+        return
+
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    reader = csv.DictReader(file)
+    reader.fieldnames = [h.strip().lower() for h in reader.fieldnames or []]
+    for row in reader:
+        if any((v or "").strip() for v in row.values() if isinstance(v, str)):
+            yield reader.line_num, {k: (v or "").strip() for k, v in row.items() if k}
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0      # duplicates left alone on purpose
+        self.rows = 0
+        self.seconds = 0.0
+        self.errors = []      # (row_number, value, message)
+
+    def error(self, row_number, value, message):
+        self.errors.append((row_number, value, message))
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def import_numbers(client, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Create Numbers for ``client`` from (row_number, dict) rows.
+
+    Columns: number, handler (name or id), collection_day, sim_status (optional).
+    """
+    report = ImportReport()
+
+    number_field = Number._meta.get_field("number")
+    collection_days = {d.lower(): d for d, _ in Number.COLLECTION_DAY_CHOICES}
+    sim_statuses = {s.lower(): s for s, _ in Number.SIM_STATUS_CHOICES}
+
+    handlers = {}
+    for handler_id, name in Handler.objects.filter(client_handler=client).values_list("id", "name"):
+        handlers[str(handler_id)] = handler_id
+        handlers.setdefault(name.strip().lower(), handler_id)
+
+    seen = set()
+
+    with transaction.atomic():
+        for batch in batched(rows, batch_size):
+            candidates = []
+
+            for row_number, row in batch:
+                raw = row.get("number", "")
+                digits = normalize_number(raw)
+
+                if not digits.isdigit():
+                    report.error(row_number, raw, "Number must contain digits only.")
+                    continue
+
+                value = int(digits)
+                try:
+                    number_field.run_validators(value)
+                except ValidationError as e:
+                    report.error(row_number, raw, " ".join(e.messages))
+                    continue
+
+                if value in seen:
+                    report.error(row_number, raw, "Duplicate number in this file.")
+                    continue
+                seen.add(value)
+
+                handler_id = handlers.get(row.get("handler", "").strip().lower())
+                if handler_id is None:
+                    report.error(row_number, raw, f"Unknown handler '{row.get('handler', '')}'.")
+                    continue
+
+                collection_day = collection_days.get(row.get("collection_day", "").strip().lower())
+                if collection_day is None:
+                    report.error(row_number, raw, f"Invalid collection day '{row.get('collection_day', '')}'.")
+                    continue
+
+                sim_status = sim_statuses.get((row.get("sim_status") or "Active").strip().lower())
+                if sim_status is None:
+                    report.error(row_number, raw, f"Invalid SIM status '{row.get('sim_status')}'.")
+                    continue
+
+                candidates.append((row_number, raw, digits, value, handler_id, collection_day, sim_status))
+
+            operators = prefix_resolver.resolve_many(c[2] for c in candidates)
+            existing = set(
+                Number.objects.filter(number__in=[c[3] for c in candidates]).values_list("number", flat=True)
+            )
+
+            new_numbers = []
+            for row_number, raw, digits, value, handler_id, collection_day, sim_status in candidates:
+                if value in existing:
+                    report.error(row_number, raw, "Number is already registered.")
+                    continue
+
+                if operators[digits] is None:
+                    report.error(row_number, raw, "No operator found for this number prefix.")
+                    continue
+
+                number = Number(
+                    number=value,
+                    sim_status=sim_status,
+                    collection_day=collection_day,
+                    operator_id=operators[digits],
+                    handler_id=handler_id,
+                    client=client,
+                )
+                number.sync_digits()
+                new_numbers.append(number)
+
+            Number.objects.bulk_create(new_numbers, batch_size=batch_size)
+            refresh_worklists(Number.objects.filter(pk__in=[n.pk for n in new_numbers]))
+            report.created += len(new_numbers)
+
+        invalidate_dashboard([client.user_client_id])
+
+    return report
+
+
+def parse_ledger_time(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = timezone.datetime(day.year, day.month, day.day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def import_ledger(rows, entry_type=None, user=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Bulk-insert Invoices and Payments from (row_number, dict) rows.
+
+    Columns: type (invoice / payment, unless ``entry_type`` is given), number,
+    time, amount, reference. Rows whose reference already exists for that type
+    are skipped, and the stored balances of every touched number are refreshed
+    per batch.
+    """
+    report = ImportReport()
+    began = time.perf_counter()
+
+    numbers = Number.objects.all()
+    if user is not None:
+        numbers = numbers.filter(client__user_client=user)
+
+    seen = {"invoice": set(), "payment": set()}
+    amount_fields = {
+        "invoice": Invoice._meta.get_field("added_load"),
+        "payment": Payment._meta.get_field("paid_amount"),
+    }
+
+    with transaction.atomic():
+        for batch in batched(rows, batch_size):
+            report.rows += len(batch)
+            parsed = []
+
+            for row_number, row in batch:
+                raw = row.get("number", "")
+                kind = (entry_type or row.get("type", "")).strip().lower()
+                if kind not in seen:
+                    report.error(row_number, raw, f"Unknown entry type '{kind}'.")
+                    continue
+
+                digits = normalize_number(raw)
+                if not digits.isdigit():
+                    report.error(row_number, raw, "Number must contain digits only.")
+                    continue
+
+                moment = parse_ledger_time(row.get("time", ""))
+                if moment is None:
+                    report.error(row_number, raw, f"Invalid time '{row.get('time', '')}'.")
+                    continue
+
+                try:
+                    amount = Decimal(row.get("amount", "").replace(",", ""))
+                except InvalidOperation:
+                    report.error(row_number, raw, f"Invalid amount '{row.get('amount', '')}'.")
+                    continue
+
+                # NaN / Infinity parse fine, and an amount too large for the column would
+                # only fail in bulk_create(), rolling back the whole file
+                if not amount.is_finite():
+                    report.error(row_number, raw, f"Invalid amount '{row.get('amount', '')}'.")
+                    continue
+                try:
+                    amount_fields[kind].run_validators(amount)
+                except ValidationError as e:
+                    report.error(row_number, raw, " ".join(e.messages))
+                    continue
+
+                reference = row.get("reference", "")
+                if kind == "invoice" and not reference:
+                    report.error(row_number, raw, "Invoices need a reference number.")
+                    continue
+
+                parsed.append((row_number, raw, kind, int(digits), moment, amount, reference))
+
+            # One lookup table per batch: number value -> Number id
+            number_ids = dict(
+                numbers.filter(number__in={p[3] for p in parsed}).values_list("number", "id")
+            )
+            existing = {
+                "invoice": set(Invoice.objects.filter(
+                    reference_number__in={p[6] for p in parsed if p[2] == "invoice"}
+                ).values_list("reference_number", flat=True)),
+                "payment": set(Payment.objects.filter(
+                    reference_number__in={p[6] for p in parsed if p[2] == "payment" and p[6]}
+                ).values_list("reference_number", flat=True)),
+            }
+
+            invoices, payments, touched = [], [], set()
+            for row_number, raw, kind, value, moment, amount, reference in parsed:
+                number_id = number_ids.get(value)
+                if number_id is None:
+                    report.error(row_number, raw, "Number is not registered.")
+                    continue
+
+                if reference and (reference in existing[kind] or reference in seen[kind]):
+                    report.skipped += 1
+                    continue
+                if reference:
+                    seen[kind].add(reference)
+
+                if kind == "invoice":
+                    invoices.append(Invoice(
+                        number_id=number_id, time=moment,
+                        added_load=amount, balance=amount, reference_number=reference,
+                    ))
+                else:
+                    payments.append(Payment(
+                        number_id=number_id, time=moment,
+                        paid_amount=amount, reference_number=reference,
+                    ))
+                touched.add(number_id)
+
+            Invoice.objects.bulk_create(invoices, batch_size=batch_size)
+            Payment.objects.bulk_create(payments, batch_size=batch_size)
+            report.created += len(invoices) + len(payments)
+
+            # bulk_create() bypasses the ledger signals
+            Number.objects.filter(pk__in=touched).refresh_balances()
+            refresh_worklists(Number.objects.filter(pk__in=touched))
+            invalidate_dashboard_for_numbers(touched)
+
+    report.errors.sort()
+    report.seconds = time.perf_counter() - began
+    return report
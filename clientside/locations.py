@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.db import connection
+from django.templatetags.static import static
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .models import Region, Province, Municipality, Barangay
+
+
+# Region → province → municipality → barangay reference data.
+# Rendered dropdown fragments are cached per parent id under a version derived
+# from the location tables themselves (row counts and highest ids), so every
+# process computes the same version and ETags agree between gunicorn workers.
+# seed_to_core refreshes the cached version after adding rows, which moves every
+# fragment to new keys at once.
+
+LOCATION_CACHE_TIMEOUT = 60 * 60 * 24 * 7     # fragments live a week unless re-seeded
+LOCATION_MAX_AGE = 60 * 60 * 24               # browser Cache-Control max-age
+LOCATION_VERSION_KEY = "locations:version"
+LOCATION_TREE_MANIFEST = "data/locations-manifest.json"    # written by export_locations
+
+LOCATION_LEVELS = {
+    # level: (model, parent field, ordering, template, context name)
+    "provinces": (Province, "region_id", "-id", "client/partials/province_dropdown.html", "provinces"),
+    "municipalities": (Municipality, "province_id", "-id", "client/partials/municipality_dropdown.html", "municipalities"),
+    "barangays": (Barangay, "municipality_id", "name", "client/partials/barangay_dropdown.html", "barangays"),
+}
+
+
+def location_data_version():
+    """Fingerprint of the location tables; changes whenever rows are added or removed."""
+    tables = [model._meta.db_table for model in (Region, Province, Municipality, Barangay)]
+    sql = " UNION ALL ".join(
+        f"SELECT {n}, COUNT(*), MAX(id) FROM {connection.ops.quote_name(table)}"
+        for n, table in enumerate(tables)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = sorted(cursor.fetchall())
+    return hashlib.md5(repr(rows).encode()).hexdigest()[:12]
+
+
+def location_version():
+    version = cache.get(LOCATION_VERSION_KEY)
+    if version is None:
+        version = location_data_version()
+        cache.set(LOCATION_VERSION_KEY, version, None)
+    return version
+
+
+async def alocation_version():
+    version = await cache.aget(LOCATION_VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(location_data_version)()
+        await cache.aset(LOCATION_VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_location_cache():
+    cache.set(LOCATION_VERSION_KEY, location_data_version(), None)
+
+
+def location_parent_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def location_etag(level, parent_id, version):
+    raw = f"{level}:{parent_id}:{version}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def location_fragment(level, parent_id):
+    """Rendered dropdown HTML for the children of ``parent_id``, cached per version."""
+    model, parent_field, ordering, template, name = LOCATION_LEVELS[level]
+    key = f"locations:{location_version()}:{level}:{parent_id}"
+
+    html = cache.get(key)
+    if html is None:
+        children = []
+        if parent_id is not None:
+            children = list(
+                model.objects.filter(**{parent_field: parent_id}).order_by(ordering).values("id", "name")
+            )
+        html = render_to_string(template, {name: children})
+        cache.set(key, html, LOCATION_CACHE_TIMEOUT)
+    return html
+
+
+async def alocation_fragment(level, parent_id):
+    """Async location_fragment() for the ASGI views; same cache keys."""
+    model, parent_field, ordering, template, name = LOCATION_LEVELS[level]
+    key = f"locations:{await alocation_version()}:{level}:{parent_id}"
+
+    html = await cache.aget(key)
+    if html is None:
+        children = []
+        if parent_id is not None:
+            children = [
+                row async for row in
+                model.objects.filter(**{parent_field: parent_id}).order_by(ordering).values("id", "name")
+            ]
+        html = render_to_string(template, {name: children})
+        await cache.aset(key, html, LOCATION_CACHE_TIMEOUT)
+    return html
+
+
+
+def location_conditions(level, param):
+    """ETag callable for django.views.decorators.http.condition."""
+    def etag(request):
+        return location_etag(level, location_parent_id(request.GET.get(param)), location_version())
+
+    return {"etag_func": etag}
+
+
+def alocation_condition(level, param):
+    """
+    condition(**location_conditions(...)) for the async views. condition() calls the
+    ETag function synchronously, and a version lookup that misses the cache queries.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            parent_id = location_parent_id(request.GET.get(param))
+            etag = quote_etag(location_etag(level, parent_id, await alocation_version()))
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                response.headers.setdefault("ETag", etag)
+            return response
+        return inner
+    return decorator
+
+
+def location_tree():
+    """
+    The whole hierarchy as compact [id, name(, parent id)] lists, in dropdown order.
+    This is the payload of the static asset written by export_locations.
+    """
+    tree = {
+        "regions": [list(r) for r in Region.objects.order_by("-id").values_list("id", "name")],
+    }
+    for level, (model, parent_field, ordering, _, _) in LOCATION_LEVELS.items():
+        tree[level] = [
+            list(row) for row in model.objects.order_by(ordering).values_list("id", "name", parent_field)
+        ]
+    return tree
+
+
+def location_tree_url():
+    # Static URL of the latest exported tree, or None when it has not been exported
+    path = finders.find(LOCATION_TREE_MANIFEST)
+    if not path:
+        return None
+    with open(path) as f:
+        return static(json.load(f)["file"])
+
+
+class LocationIndex:
+    """
+    Child → parent ids for every province, municipality and barangay, held in memory.
+
+    Used to validate address selections without querying the location tables;
+    reloaded whenever the location version changes. An id it does not know sends
+    it back to the tables' fingerprint, so rows added outside seed_to_core (the
+    admin, a restore) are picked up instead of being rejected until a restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self.regions = set()
+        self.parents = {}
+
+    def _load(self, version=None):
+        version = version or location_version()
+        with self._lock:
+            if self._version != version:
+                self.regions = set(Region.objects.values_list("id", flat=True))
+                self.parents = {
+                    level: dict(model.objects.values_list("id", parent_field))
+                    for level, (model, parent_field, _, _, _) in LOCATION_LEVELS.items()
+                }
+                self._version = version
+        return self
+
+    def _contains(self, level, location_id):
+        if level == "regions":
+            return location_id in self.regions
+        return location_id in self.parents[level]
+
+    def exists(self, level, location_id):
+        if self._load()._contains(level, location_id):
+            return True
+
+        version = location_data_version()
+        if version == self._version:
+            return False
+        cache.set(LOCATION_VERSION_KEY, version, None)
+        return self._load(version)._contains(level, location_id)
+
+    def parent(self, level, location_id):
+        return self._load().parents[level].get(location_id)
+
+
+location_index = LocationIndex()
@@ -0,0 +1,153 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, close_old_connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import Client as TestClient
+from django.urls import reverse
+
+from clientside.models import Number
+
+
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+MODES = ["pgbouncer", "persistent", "pool"]
+DEFAULT_MODES = ["pgbouncer", "persistent"]    # pool needs psycopg[pool], not in requirements.txt
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a typical collector request mix under each DB_CONNECTION_MODE against a local "
+        "database and report connection overhead, p50 and p99 latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=DEFAULT_MODES)
+        parser.add_argument("--username", required=True, help="Existing user whose data the requests read")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode")
+        parser.add_argument("--concurrency", type=int, default=4, help="Client threads per mode")
+        parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local database host")
+        parser.add_argument("--worker", action="store_true", help="Internal: run one mode in this process")
+
+    def handle(self, *args, **options):
+        host = settings.DATABASES["default"].get("HOST") or ""
+        if host not in LOCAL_HOSTS and not options["allow_remote"]:
+            raise CommandError(f"Refusing to benchmark against non-local host '{host}'. Use --allow-remote to override.")
+
+        if options["worker"]:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        results = []
+        for mode in options["modes"]:
+            self.stdout.write(f"Running {mode}...")
+            env = dict(os.environ, DB_CONNECTION_MODE=mode)
+            command = [
+                sys.executable, sys.argv[0], "bench_connections", "--worker",
+                "--username", options["username"],
+                "--requests", str(options["requests"]),
+                "--concurrency", str(options["concurrency"]),
+            ]
+            if options["allow_remote"]:
+                command.append("--allow-remote")
+
+            proc = subprocess.run(command, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                self.stdout.write(self.style.ERROR(f"  {mode} failed: {proc.stderr.strip().splitlines()[-1:]}"))
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'mode':<12}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'connects':>10}{'connect ms':>12}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['mode']:<12}{r['throughput']:>9.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                f"{r['connections']:>10}{r['connect_ms_mean']:>12.2f}"
+            )
+
+    def run_worker(self, options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} not found.")
+
+        number = Number.objects.filter(client__user_client=user).order_by("number").first()
+        paths = [
+            reverse("dashboard"),
+            reverse("dashboard") + "?show=all",
+            reverse("clients"),
+            reverse("search-number") + "?q=9",
+        ]
+        if number:
+            paths += [
+                reverse("number-detail", args=[number.id]),
+                reverse("hx-history-table", args=[number.id]),
+            ]
+
+        # Time every physical connect, whichever thread makes it
+        connects = []
+        original_connect = BaseDatabaseWrapper.connect
+
+        def timed_connect(wrapper):
+            started = time.perf_counter()
+            original_connect(wrapper)
+            connects.append((time.perf_counter() - started) * 1000)
+
+        BaseDatabaseWrapper.connect = timed_connect
+        connection.close()
+
+        latencies = []
+        lock = threading.Lock()
+        per_thread = max(options["requests"] // options["concurrency"], 1)
+
+        def client_loop(offset):
+            client = TestClient(HTTP_HOST="localhost")
+            client.force_login(user)
+            for i in range(per_thread):
+                path = paths[(offset + i) % len(paths)]
+                # The test client skips the request_started / request_finished
+                # connection handling that a real server does; replay it here
+                started = time.perf_counter()
+                close_old_connections()
+                response = client.get(path)
+                close_old_connections()
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+                with lock:
+                    latencies.append(elapsed)
+
+        began = time.perf_counter()
+        threads = [threading.Thread(target=client_loop, args=(n,)) for n in range(options["concurrency"])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - began
+
+        return {
+            "mode": settings.DB_CONNECTION_MODE,
+            "requests": len(latencies),
+            "throughput": len(latencies) / wall if wall else 0.0,
+            "p50_ms": percentile(latencies, 50),
+            "p99_ms": percentile(latencies, 99),
+            "mean_ms": statistics.mean(latencies) if latencies else 0.0,
+            "connections": len(connects),
+            "connect_ms_mean": statistics.mean(connects) if connects else 0.0,
+        }
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client as TestClient
+from django.urls import reverse
+
+from clientside.management.commands.bench_connections import LOCAL_HOSTS, percentile
+from clientside.models import Municipality, Number, Region
+
+
+MODES = ["wsgi", "asgi"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the htmx partial endpoints against one in-process worker: the sync views "
+        "through the WSGI handler with --threads threads, and the async views through the "
+        "ASGI handler at each --concurrency level. Reports req/s and p50 / p95 / p99 latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+        parser.add_argument("--username", required=True, help="Existing user whose data the requests read")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[1, 8, 32, 64],
+            help="In-flight requests (asgi) / client threads (wsgi) per run",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=1,
+            help="WSGI worker threads; 1 models a sync worker (default: %(default)s)",
+        )
+        parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local database host")
+        parser.add_argument("--worker", choices=MODES, help="Internal: run one mode in this process")
+
+    def handle(self, *args, **options):
+        host = settings.DATABASES["default"].get("HOST") or ""
+        if host not in LOCAL_HOSTS and not options["allow_remote"]:
+            raise CommandError(f"Refusing to benchmark against non-local host '{host}'. Use --allow-remote to override.")
+
+        if options["worker"]:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        results = []
+        for mode in options["modes"]:
+            self.stdout.write(f"Running {mode}...")
+            # URL routing reads ASYNC_PARTIALS at import, so each mode gets its own process
+            env = dict(os.environ, ASYNC_PARTIALS="True" if mode == "asgi" else "False")
+            command = [
+                sys.executable, sys.argv[0], "bench_partials", "--worker", mode,
+                "--username", options["username"],
+                "--requests", str(options["requests"]),
+                "--threads", str(options["threads"]),
+                "--concurrency", *[str(c) for c in options["concurrency"]],
+            ]
+            if options["allow_remote"]:
+                command.append("--allow-remote")
+
+            proc = subprocess.run(command, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                self.stdout.write(self.style.ERROR(f"  {mode} failed: {proc.stderr.strip().splitlines()[-1:]}"))
+                continue
+            results += json.loads(proc.stdout.strip().splitlines()[-1])
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'mode':<6}{'in flight':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['mode']:<6}{r['concurrency']:>10}{r['throughput']:>9.1f}"
+                f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            )
+
+    def partial_paths(self, user):
+        paths = [
+            reverse("search-number"),
+            reverse("search-number") + "?q=9",
+            reverse("search-clients"),
+            reverse("search-clients") + "?search=a",
+        ]
+
+        number = Number.objects.filter(client__user_client=user).order_by("number").first()
+        if number:
+            paths.append(reverse("hx-history-table", args=[number.id]))
+
+        region = Region.objects.order_by("id").first()
+        municipality = Municipality.objects.order_by("id").first()
+        if region:
+            paths.append(reverse("load-provinces") + f"?region={region.id}")
+        if municipality:
+            paths.append(reverse("load-barangays") + f"?municipality={municipality.id}")
+        return paths
+
+    def run_worker(self, options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} not found.")
+
+        # Both test clients send Host: testserver
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        paths = self.partial_paths(user)
+        runs = []
+        for concurrency in options["concurrency"]:
+            if options["worker"] == "asgi":
+                latencies, wall = asyncio.run(self.run_asgi(user, paths, options["requests"], concurrency))
+            else:
+                latencies, wall = self.run_wsgi(user, paths, options["requests"], concurrency, options["threads"])
+
+            runs.append({
+                "mode": options["worker"],
+                "concurrency": concurrency,
+                "requests": len(latencies),
+                "throughput": len(latencies) / wall if wall else 0.0,
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+            })
+        return runs
+
+    def run_wsgi(self, user, paths, requests, concurrency, threads):
+        # `concurrency` clients queue on `threads` worker threads, like a sync worker
+        # behind a listen backlog: latency includes the time spent waiting for a thread
+        latencies = []
+        lock = threading.Lock()
+        worker_slots = threading.Semaphore(threads)
+        per_client = max(requests // concurrency, 1)
+
+        def client_loop(offset):
+            client = TestClient()
+            client.force_login(user)
+            for i in range(per_client):
+                path = paths[(offset + i) % len(paths)]
+                started = time.perf_counter()
+                with worker_slots:
+                    close_old_connections()
+                    response = client.get(path, HTTP_HX_REQUEST="true")
+                    close_old_connections()
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+                with lock:
+                    latencies.append(elapsed)
+
+        began = time.perf_counter()
+        clients = [threading.Thread(target=client_loop, args=(n,)) for n in range(concurrency)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        return latencies, time.perf_counter() - began
+
+    async def run_asgi(self, user, paths, requests, concurrency):
+        client = AsyncClient()
+        await client.aforce_login(user)
+
+        latencies = []
+        per_client = max(requests // concurrency, 1)
+
+        async def client_loop(offset):
+            for i in range(per_client):
+                path = paths[(offset + i) % len(paths)]
+                started = time.perf_counter()
+                response = await client.get(path, headers={"hx-request": "true"})
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+                latencies.append(elapsed)
+
+        began = time.perf_counter()
+        await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+        return latencies, time.perf_counter() - began
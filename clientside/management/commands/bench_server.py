@@ -0,0 +1,177 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client as TestClient
+from django.urls import reverse
+
+from clientside.management.commands.bench_connections import LOCAL_HOSTS, percentile
+from clientside.models import Number
+
+
+# name: (command line, extra environment); {port} is filled in per run
+PROFILES = {
+    "runserver": (
+        [sys.executable, "manage.py", "runserver", "127.0.0.1:{port}", "--noreload"],
+        {},
+    ),
+    "gunicorn": (
+        ["gunicorn", "LoadTracker.wsgi", "--bind", "127.0.0.1:{port}", "--pid", ""],
+        {"GUNICORN_ACCESSLOG": "/dev/null"},
+    ),
+    "gunicorn-asgi": (
+        ["gunicorn", "LoadTracker.asgi", "--bind", "127.0.0.1:{port}", "--pid", ""],
+        {"GUNICORN_ACCESSLOG": "/dev/null", "GUNICORN_WORKER_CLASS": "asgi"},
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Start each server profile on a local port and replay a synthetic collector load "
+        "(dashboard, client list, number search, history) against it over HTTP. "
+        "Local database only unless --allow-remote"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+        parser.add_argument("--username", required=True, help="Existing user whose data the requests read")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per profile")
+        parser.add_argument("--clients", type=int, default=16, help="Concurrent simulated collectors")
+        parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local database host")
+
+    def handle(self, *args, **options):
+        host = settings.DATABASES["default"].get("HOST") or ""
+        if host not in LOCAL_HOSTS and not options["allow_remote"]:
+            raise CommandError(f"Refusing to benchmark against non-local host '{host}'. Use --allow-remote to override.")
+
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} not found.")
+
+        # A real session row every server process can read
+        client = TestClient()
+        client.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+        paths = self.collector_paths(user)
+
+        results = []
+        for name in options["profiles"]:
+            self.stdout.write(f"Running {name}...")
+            try:
+                results.append(self.run_profile(name, paths, cookie, options))
+            except (OSError, RuntimeError) as e:
+                self.stdout.write(self.style.ERROR(f"  {name} failed: {e}"))
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'profile':<15}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['profile']:<15}{r['throughput']:>9.1f}{r['p50_ms']:>9.2f}"
+                f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['errors']:>8}"
+            )
+
+    def collector_paths(self, user):
+        # Weighted like a collector's day: mostly the dashboard and lookups
+        paths = [
+            reverse("dashboard"),
+            reverse("dashboard"),
+            reverse("dashboard") + "?day=next",
+            reverse("clients"),
+            reverse("search-clients") + "?search=a",
+            reverse("search-number") + "?q=9",
+        ]
+        number = Number.objects.filter(client__user_client=user).order_by("number").first()
+        if number:
+            paths += [
+                reverse("number-detail", args=[number.id]),
+                reverse("hx-history-table", args=[number.id]),
+            ]
+        return paths
+
+    def run_profile(self, name, paths, cookie, options):
+        command, extra_env = PROFILES[name]
+        port = free_port()
+        command = [part.format(port=port) for part in command]
+        env = dict(os.environ, **extra_env)
+
+        server = subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            self.wait_until_up(server, base)
+            return self.replay(name, base, paths, cookie, options["requests"], options["clients"])
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def wait_until_up(self, server, base, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(server.stderr.read().strip().splitlines()[-1:])
+            try:
+                urllib.request.urlopen(base + reverse("healthz"), timeout=2).close()
+                return
+            except urllib.error.HTTPError:
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"server did not answer within {timeout}s")
+
+    def replay(self, name, base, paths, cookie, requests, clients):
+        latencies, errors = [], []
+        lock = threading.Lock()
+        per_client = max(requests // clients, 1)
+
+        def collector(offset):
+            for i in range(per_client):
+                path = paths[(offset + i) % len(paths)]
+                request = urllib.request.Request(base + path, headers={"Cookie": cookie, "Host": "localhost"})
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=60) as response:
+                        response.read()
+                except OSError as e:
+                    with lock:
+                        errors.append(f"{path}: {e}")
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+        began = time.perf_counter()
+        threads = [threading.Thread(target=collector, args=(n,)) for n in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - began
+
+        return {
+            "profile": name,
+            "requests": len(latencies),
+            "throughput": len(latencies) / wall if wall else 0.0,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "errors": len(errors),
+        }
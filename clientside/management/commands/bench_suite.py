@@ -0,0 +1,178 @@
+import json
+import subprocess
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clientside.management.commands.bench_connections import LOCAL_HOSTS, percentile
+from clientside.models import Client, Invoice, Number, Payment
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the main pages (dashboard, client list, history partial, number search, statement PDF) "
+        "through the test client and write p50 / p95 / p99 latency and query counts to a JSON report. "
+        "Pass --compare with an earlier report to see the difference. Local database only unless --allow-remote"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="User whose data the requests read (default: the one with most numbers)")
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per endpoint first")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request")
+        parser.add_argument("--output", default="bench-report.json")
+        parser.add_argument("--compare", help="Earlier report to compare against")
+        parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local database host")
+
+    def handle(self, *args, **options):
+        host = settings.DATABASES["default"].get("HOST") or ""
+        if host not in LOCAL_HOSTS and not options["allow_remote"]:
+            raise CommandError(f"Refusing to benchmark against non-local host '{host}'. Use --allow-remote to override.")
+
+        user = self.bench_user(options["username"])
+        number = (
+            Number.objects.filter(client__user_client=user)
+            .annotate(entries=Count("invoices"))
+            .order_by("-entries", "number")
+            .first()
+        )
+        if number is None:
+            raise CommandError(f"User {user.username} has no numbers. Run generate_data first.")
+
+        # The test client sends Host: testserver
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        client = TestClient()
+        client.force_login(user)
+
+        endpoints = self.endpoints(number)
+        results = {}
+        for name, (path, headers) in endpoints.items():
+            self.stdout.write(f"Running {name}...")
+            results[name] = self.measure(client, path, headers, options)
+
+        report = {
+            "commit": git_commit(),
+            "created": timezone.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "username": user.username,
+            "iterations": options["iterations"],
+            "cold_cache": options["cold"],
+            "data": {
+                "clients": Client.objects.filter(user_client=user).count(),
+                "numbers": Number.objects.filter(client__user_client=user).count(),
+                "invoices": Invoice.objects.count(),
+                "payments": Payment.objects.count(),
+                "history_entries": number.entries + number.payments.count(),
+            },
+            "endpoints": results,
+        }
+        Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+
+        baseline = None
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'endpoint':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+            + (f"{'Δp95 %':>9}{'Δqueries':>10}" if baseline else "")
+        )
+        for name, r in results.items():
+            line = (
+                f"{name:<22}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+                f"{r['p99_ms']:>9.2f}{r['queries']:>9}"
+            )
+            before = (baseline or {}).get("endpoints", {}).get(name)
+            if before:
+                change = (r["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+                line += f"{change:>+9.1f}{r['queries'] - before['queries']:>+10}"
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS(f"\nReport written to {options['output']}"))
+        if baseline:
+            self.stdout.write(f"Compared with {baseline.get('commit') or options['compare']}")
+
+    def bench_user(self, username):
+        User = get_user_model()
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"User {username} not found.")
+            return user
+
+        user = (
+            User.objects.annotate(numbers=Count("clients__number"))
+            .filter(numbers__gt=0)
+            .order_by("-numbers", "id")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No user owns any numbers. Run generate_data first.")
+        return user
+
+    def endpoints(self, number):
+        # name: (path, extra headers); the history partial and search are htmx requests
+        today = timezone.localdate()
+        start = today - timedelta(days=365)
+        digits = number.digits
+
+        return {
+            "dashboard": (reverse("dashboard"), {}),
+            "list_client": (reverse("clients"), {}),
+            "hx_history_table": (reverse("hx-history-table", args=[number.id]), {"HTTP_HX_REQUEST": "true"}),
+            "search_number_page": (reverse("search-number") + f"?q={digits[:4]}", {"HTTP_HX_REQUEST": "true"}),
+            "print_number_history": (
+                reverse("print_number_history", args=[number.id, start.isoformat(), today.isoformat()]),
+                {},
+            ),
+        }
+
+    def measure(self, client, path, headers, options):
+        for _ in range(options["warmup"]):
+            client.get(path, **headers)
+
+        latencies, queries = [], []
+        for _ in range(options["iterations"]):
+            if options["cold"]:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, **headers)
+                elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+            latencies.append(elapsed)
+            queries.append(len(captured))
+
+        return {
+            "path": path,
+            "requests": len(latencies),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "queries": max(queries),
+            "queries_min": min(queries),
+            "bytes": len(response.content),
+        }
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from clientside.models import Number
+from clientside.worklists import WORKLIST_DAYS_AHEAD, WORKLIST_DAYS_BEHIND, refresh_worklists, worklist_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the dashboard worklists (WorklistEntry) for the upcoming collection days. "
+        "Meant to run nightly, e.g. cron: 30 0 * * * python manage.py build_worklists"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days-ahead", type=int, default=WORKLIST_DAYS_AHEAD,
+            help="Collection days after today to build (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--days-behind", type=int, default=WORKLIST_DAYS_BEHIND,
+            help="Collection days before today to build (default: %(default)s).",
+        )
+        parser.add_argument("--all", action="store_true", help="Build every collection day.")
+        parser.add_argument("--user", type=int, help="Limit to the numbers of one user (id).")
+
+    def handle(self, *args, **options):
+        numbers = Number.objects.all()
+        if options["user"]:
+            numbers = numbers.filter(client__user_client_id=options["user"])
+
+        if options["all"]:
+            days = [d for d, _ in Number.COLLECTION_DAY_CHOICES]
+        else:
+            days = worklist_days(timezone.localdate(), options["days_behind"], options["days_ahead"])
+            numbers = numbers.filter(collection_day__in=days)
+
+        began = time.perf_counter()
+        built = refresh_worklists(numbers)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {built} worklist rows for {', '.join(days)} in {time.perf_counter() - began:.2f}s."
+        ))
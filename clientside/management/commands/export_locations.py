@@ -0,0 +1,43 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clientside.locations import location_tree, LOCATION_TREE_MANIFEST
+
+
+class Command(BaseCommand):
+    help = "Export the Region → Province → Municipality → Barangay tree as a versioned, pre-gzipped static JSON asset"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=str(Path(settings.STATICFILES_DIRS[0])),
+            help="Static directory to write data/locations.<version>.json(.gz) into.",
+        )
+
+    def handle(self, *args, **options):
+        tree = location_tree()
+        payload = json.dumps(tree, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        version = hashlib.sha256(payload).hexdigest()[:12]
+
+        out_dir = Path(options["output_dir"]) / Path(LOCATION_TREE_MANIFEST).parent
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        name = f"locations.{version}.json"
+        (out_dir / name).write_bytes(payload)
+        # mtime=0 keeps the .gz byte-identical across runs for the same data
+        (out_dir / f"{name}.gz").write_bytes(gzip.compress(payload, compresslevel=9, mtime=0))
+
+        manifest = {"version": version, "file": f"{Path(LOCATION_TREE_MANIFEST).parent}/{name}"}
+        (out_dir / Path(LOCATION_TREE_MANIFEST).name).write_text(json.dumps(manifest))
+
+        gz_size = (out_dir / f"{name}.gz").stat().st_size
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(tree['regions'])} regions, {len(tree['provinces'])} provinces, "
+            f"{len(tree['municipalities'])} municipalities, {len(tree['barangays'])} barangays "
+            f"to {out_dir / name} ({len(payload) / 1024:.0f} KB, {gz_size / 1024:.0f} KB gzipped)."
+        ))
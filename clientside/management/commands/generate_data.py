@@ -0,0 +1,211 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from clientside.dashboard import invalidate_dashboard
+from clientside.models import (
+    Address, Barangay, Client, Handler, Invoice, Number, NumberOperatorIdentifier, Payment,
+)
+from clientside.worklists import refresh_worklists
+
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Mark", "Joy", "Carlo", "Liza",
+    "Ramon", "Grace", "Paolo", "Cristina", "Miguel", "Angelica", "Noel", "Jenny", "Rey", "Marites",
+]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Villanueva", "Ramos",
+    "Aquino", "Castillo", "Dela Cruz", "Gonzales", "Navarro", "Salazar", "Domingo", "Pascual", "Lim", "Tan",
+]
+TRADE_WORDS = [
+    "Sari-Sari", "Loading", "Mini Mart", "Eatery", "Trading", "Pharmacy", "Hardware",
+    "Bakeshop", "Merchandise", "Enterprises", "Store", "General Merchandise",
+]
+LOAD_AMOUNTS = [Decimal(a) for a in ("50", "100", "200", "300", "500", "1000", "1500", "2000")]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, clients (with addresses), handlers, numbers and years of "
+        "Invoice / Payment history for load testing. Run populate_operator and seed_to_core first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3)
+        parser.add_argument("--clients", type=int, default=50, help="Clients per user")
+        parser.add_argument("--handlers", type=int, default=2, help="Handlers per client")
+        parser.add_argument("--numbers", type=int, default=8, help="Numbers per client")
+        parser.add_argument("--years", type=float, default=2, help="Years of ledger history per number")
+        parser.add_argument("--loads-per-month", type=int, default=4, help="Average invoices per number per month")
+        parser.add_argument("--pay-rate", type=float, default=0.85, help="Share of invoices that get paid")
+        parser.add_argument("--prefix", default="loadtest", help="Username prefix; users are <prefix>001, ...")
+        parser.add_argument("--password", default="loadtest", help="Password of every generated user")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable data")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk INSERT")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        prefixes = list(NumberOperatorIdentifier.objects.values_list("number", "operator_id"))
+        if not prefixes:
+            raise CommandError("No operator prefixes found. Run populate_operator first.")
+
+        barangays = list(Barangay.objects.values_list(
+            "id", "municipality_id", "municipality__province_id", "municipality__province__region_id",
+        ))
+        if not barangays:
+            self.stdout.write(self.style.WARNING("No locations seeded; addresses will be left empty."))
+
+        User = get_user_model()
+        usernames = [f"{options['prefix']}{i:03d}" for i in range(1, options["users"] + 1)]
+        taken = list(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        if taken:
+            raise CommandError(f"Users already exist: {', '.join(taken)}. Pick another --prefix.")
+
+        self.used_numbers = set(Number.objects.values_list("number", flat=True))
+        password = make_password(options["password"])
+        now = timezone.now()
+        history_start = now - timedelta(days=round(365 * options["years"]))
+
+        started = time.perf_counter()
+        totals = {"clients": 0, "numbers": 0, "invoices": 0, "payments": 0}
+
+        for username in usernames:
+            with transaction.atomic():
+                user = User.objects.create(username=username, password=password)
+                numbers = self.create_portfolio(user, options, prefixes, barangays, totals)
+                self.create_ledger(numbers, history_start, now, options, totals)
+
+                user_numbers = Number.objects.filter(client__user_client=user)
+                # Everything above went through bulk_create(), which skips the signals
+                user_numbers.refresh_balances()
+                Client.objects.filter(user_client=user).refresh_search_text()
+                refresh_worklists(user_numbers)
+                invalidate_dashboard([user.pk])
+
+            self.stdout.write(f"  {username}: {len(numbers)} numbers")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(usernames)} users, {totals['clients']} clients, {totals['numbers']} numbers, "
+            f"{totals['invoices']} invoices and {totals['payments']} payments "
+            f"in {time.perf_counter() - started:.1f}s (password: {options['password']})."
+        ))
+
+    def person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def phone_number(self, prefixes):
+        # Ten digits starting with a known operator prefix, unique across the table
+        while True:
+            prefix, operator_id = self.rng.choice(prefixes)
+            width = 10 - len(str(prefix))
+            value = int(f"{prefix}{self.rng.randrange(10 ** width):0{width}d}")
+            if value not in self.used_numbers:
+                self.used_numbers.add(value)
+                return value, operator_id
+
+    def create_portfolio(self, user, options, prefixes, barangays, totals):
+        rng = self.rng
+
+        addresses = []
+        for _ in range(options["clients"]):
+            if barangays:
+                barangay_id, municipality_id, province_id, region_id = rng.choice(barangays)
+            else:
+                barangay_id = municipality_id = province_id = region_id = None
+            addresses.append(Address(
+                region_id=region_id, province_id=province_id,
+                municipality_id=municipality_id, barangay_id=barangay_id,
+                house_number_street=f"{rng.randint(1, 999)} Purok {rng.randint(1, 7)}",
+            ))
+        # Address.id is an AutoField: only backends that return ids from bulk INSERTs
+        # (PostgreSQL, SQLite 3.35+) get them back here
+        addresses = Address.objects.bulk_create(addresses, batch_size=self.batch_size)
+
+        clients = []
+        for address in addresses:
+            owner = self.person()
+            clients.append(Client(
+                name=owner,
+                trade_name=f"{owner.split()[-1]}'s {rng.choice(TRADE_WORDS)}",
+                contact_number=rng.randint(900000000, 999999999),
+                status=rng.choices(["Active", "Inactive", "Disabled"], weights=[90, 8, 2])[0],
+                primary_address=address,
+                application_date=(timezone.localdate() - timedelta(days=rng.randint(30, 2000))),
+                user_client=user,
+            ))
+        Client.objects.bulk_create(clients, batch_size=self.batch_size)
+        totals["clients"] += len(clients)
+
+        handlers = [
+            Handler(name=self.person(), contact=rng.randint(900000000, 999999999), client_handler=client)
+            for client in clients
+            for _ in range(options["handlers"])
+        ]
+        handlers = Handler.objects.bulk_create(handlers, batch_size=self.batch_size)
+        handlers_by_client = {}
+        for handler in handlers:
+            handlers_by_client.setdefault(handler.client_handler_id, []).append(handler)
+
+        days = [d for d, _ in Number.COLLECTION_DAY_CHOICES]
+        numbers = []
+        for client in clients:
+            for _ in range(options["numbers"]):
+                value, operator_id = self.phone_number(prefixes)
+                number = Number(
+                    number=value,
+                    sim_status=rng.choices(["Active", "Inactive", "Disabled"], weights=[85, 10, 5])[0],
+                    operator_id=operator_id,
+                    client=client,
+                    handler=rng.choice(handlers_by_client[client.pk]),
+                    collection_day=rng.choice(days),
+                )
+                number.sync_digits()
+                numbers.append(number)
+        Number.objects.bulk_create(numbers, batch_size=self.batch_size)
+        totals["numbers"] += len(numbers)
+        return numbers
+
+    def create_ledger(self, numbers, history_start, now, options, totals):
+        rng = self.rng
+        span = (now - history_start).total_seconds()
+        per_number = max(int(options["loads_per_month"] * 12 * options["years"]), 0)
+
+        invoices, payments = [], []
+        for number in numbers:
+            count = rng.randint(per_number // 2, per_number + per_number // 2) if per_number else 0
+            for n in range(count):
+                moment = history_start + timedelta(seconds=rng.uniform(0, span))
+                amount = rng.choice(LOAD_AMOUNTS)
+                reference = f"GEN-{number.number}-{n}"
+                invoices.append(Invoice(
+                    number=number, time=moment, added_load=amount, balance=amount,
+                    reference_number=f"INV-{reference}",
+                ))
+
+                paid_at = moment + timedelta(days=rng.uniform(0, 10))
+                if paid_at < now and rng.random() < options["pay_rate"]:
+                    payments.append(Payment(
+                        number=number, time=paid_at, paid_amount=amount,
+                        reference_number=f"PAY-{reference}",
+                    ))
+
+            if len(invoices) >= self.batch_size * 5:
+                self.flush(invoices, payments, totals)
+                invoices, payments = [], []
+
+        self.flush(invoices, payments, totals)
+
+    def flush(self, invoices, payments, totals):
+        Invoice.objects.bulk_create(invoices, batch_size=self.batch_size)
+        Payment.objects.bulk_create(payments, batch_size=self.batch_size)
+        totals["invoices"] += len(invoices)
+        totals["payments"] += len(payments)
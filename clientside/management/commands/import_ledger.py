@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from clientside.importers import read_rows, import_ledger, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Stream invoices (top-ups) and payments (collections) from reconciliation CSV files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="CSV / XLSX with columns: type, number, time, amount, reference")
+        parser.add_argument("--type", choices=["invoice", "payment"], help="Treat every row as this type (no type column needed)")
+        parser.add_argument("--user", help="Only match numbers owned by this username")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['user']} not found.")
+
+        for path in options["paths"]:
+            self.stdout.write(f"Importing {path}...")
+
+            with open(path, "rb") as f:
+                try:
+                    report = import_ledger(
+                        read_rows(f, path),
+                        entry_type=options["type"],
+                        user=user,
+                        batch_size=options["batch_size"],
+                    )
+                except ValueError as e:
+                    raise CommandError(str(e))
+
+            for row_number, value, message in report.errors:
+                self.stdout.write(self.style.ERROR(f"  row {row_number} ({value}): {message}"))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"  {report.created} entries created, {report.skipped} duplicates skipped, "
+                f"{report.failed} rows rejected; {report.rows} rows in {report.seconds:.2f}s "
+                f"({report.rows_per_second:.0f} rows/s)"
+            ))
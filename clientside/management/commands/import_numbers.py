@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clientside.models import Client
+from clientside.importers import read_rows, import_numbers, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Bulk-register numbers for a client from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV / XLSX with columns: number, handler, collection_day, sim_status")
+        parser.add_argument("--client", required=True, help="Client UUID")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            client = Client.objects.get(id=options["client"])
+        except (Client.DoesNotExist, ValueError):
+            raise CommandError(f"Client {options['client']} not found.")
+
+        began = time.perf_counter()
+        with open(options["path"], "rb") as f:
+            try:
+                report = import_numbers(client, read_rows(f, options["path"]), batch_size=options["batch_size"])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        for row_number, value, message in report.errors:
+            self.stdout.write(self.style.ERROR(f"  row {row_number} ({value}): {message}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.created} numbers imported, {report.failed} rows skipped "
+            f"in {time.perf_counter() - began:.2f}s."
+        ))
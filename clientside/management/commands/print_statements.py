@@ -0,0 +1,169 @@
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from clientside.models import Number, Invoice, Payment
+from clientside.statements import render_statement
+
+
+STATEMENTS_IN_FLIGHT = 2       # submitted but unfinished statements per worker process
+
+
+def init_worker():
+    # Spawned workers need the app registry; forked ones must not reuse the parent's sockets
+    django.setup()
+    connections.close_all()
+
+
+def render_one(number_id, start, end):
+    start_date = timezone.make_aware(datetime.strptime(start, "%Y-%m-%d"))
+    end_date = timezone.make_aware(
+        datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+    )
+
+    began = time.perf_counter()
+    number = Number.objects.select_related("client").get(pk=number_id)
+
+    buffer = io.BytesIO()
+    render_statement(number, start_date, end_date, buffer, start_label=start, end_label=end)
+
+    filename = f"history-{number.number}-{start}-{end}.pdf"
+    return filename, buffer.getvalue(), time.perf_counter() - began
+
+
+class Command(BaseCommand):
+    help = "Render history statement PDFs for many numbers in parallel"
+
+    def add_arguments(self, parser):
+        today = timezone.localdate()
+
+        parser.add_argument("--client", help="Client UUID")
+        parser.add_argument("--handler", type=int, help="Handler id")
+        parser.add_argument("--collection-day", choices=[d for d, _ in Number.COLLECTION_DAY_CHOICES])
+        parser.add_argument("--start", default=today.replace(day=1).isoformat(), help="YYYY-MM-DD (default: first of this month)")
+        parser.add_argument("--end", default=today.isoformat(), help="YYYY-MM-DD (default: today)")
+        parser.add_argument("--skip-empty", action="store_true", help="Skip numbers with no invoice or payment in the range")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = render inline)")
+
+        output = parser.add_mutually_exclusive_group(required=True)
+        output.add_argument("--output-dir", help="Write one PDF per number into this directory")
+        output.add_argument("--zip", help="Write all PDFs into this zip file")
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        try:
+            start_date = datetime.strptime(start, "%Y-%m-%d")
+            end_date = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD")
+
+        numbers = Number.objects.all()
+        if options["client"]:
+            numbers = numbers.filter(client_id=options["client"])
+        if options["handler"]:
+            numbers = numbers.filter(handler_id=options["handler"])
+        if options["collection_day"]:
+            numbers = numbers.filter(collection_day=options["collection_day"])
+
+        if options["skip_empty"]:
+            in_range = {
+                "time__gte": timezone.make_aware(start_date),
+                "time__lt": timezone.make_aware(end_date),
+            }
+            numbers = numbers.filter(
+                Exists(Invoice.objects.filter(number=OuterRef("pk"), **in_range))
+                | Exists(Payment.objects.filter(number=OuterRef("pk"), **in_range))
+            )
+
+        labels = dict(numbers.order_by("number").values_list("id", "number"))
+        number_ids = list(labels)
+        if not number_ids:
+            self.stdout.write(self.style.WARNING("No numbers matched."))
+            return
+
+        if options["output_dir"]:
+            out_dir = Path(options["output_dir"])
+            out_dir.mkdir(parents=True, exist_ok=True)
+            archive = None
+        else:
+            archive = zipfile.ZipFile(options["zip"], "w", compression=zipfile.ZIP_DEFLATED)
+
+        workers = max(options["workers"], 1)
+        self.stdout.write(f"Rendering {len(number_ids)} statements ({start} → {end}) with {workers} worker(s)...")
+
+        began = time.perf_counter()
+        total_bytes = 0
+        failed = 0
+
+        try:
+            for number_id, result, error in self.render_all(number_ids, start, end, workers):
+                if error is not None:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"  {labels[number_id]}  failed: {error!r}"))
+                    continue
+
+                filename, pdf, elapsed = result
+                if archive:
+                    archive.writestr(filename, pdf)
+                else:
+                    (out_dir / filename).write_bytes(pdf)
+
+                total_bytes += len(pdf)
+                self.stdout.write(f"  {filename}  {elapsed:.2f}s  {len(pdf) / 1024:.1f} KB")
+        finally:
+            if archive:
+                archive.close()
+
+        wall = time.perf_counter() - began
+        rendered = len(number_ids) - failed
+        self.stdout.write(self.style.SUCCESS(
+            f"{rendered} statements, {total_bytes / 1024 / 1024:.1f} MB in {wall:.2f}s "
+            f"({rendered / wall:.1f} statements/s)"
+        ))
+        if failed:
+            raise CommandError(f"{failed} of {len(number_ids)} statements failed; see the errors above.")
+
+    def render_all(self, number_ids, start, end, workers):
+        """
+        Yield (number id, (filename, pdf, seconds) or None, exception or None) as each
+        statement finishes. One failing number is reported, not fatal to the batch.
+        """
+        if workers == 1:
+            for number_id in number_ids:
+                try:
+                    yield number_id, render_one(number_id, start, end), None
+                except Exception as e:
+                    yield number_id, None, e
+            return
+
+        # Children open their own connections
+        connections.close_all()
+
+        queue = iter(number_ids)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            # Only a few statements per worker are submitted at a time, and finished ones
+            # are dropped once handed over, so the PDFs held in memory stay bounded
+            pending = {
+                pool.submit(render_one, number_id, start, end): number_id
+                for number_id in islice(queue, workers * STATEMENTS_IN_FLIGHT)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    number_id = pending.pop(future)
+                    error = future.exception()
+                    yield number_id, None if error else future.result(), error
+
+                for number_id in islice(queue, len(done)):
+                    pending[pool.submit(render_one, number_id, start, end)] = number_id
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from clientside.dashboard import invalidate_dashboard
+from clientside.models import Number
+from clientside.worklists import refresh_worklists
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the stored Number balances from the Invoice / Payment ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report numbers whose stored values differ from the ledger; write nothing.",
+        )
+        parser.add_argument(
+            "--client",
+            help="Limit to the numbers of one client (UUID).",
+        )
+
+    def handle(self, *args, **options):
+        numbers = Number.objects.all()
+        if options["client"]:
+            numbers = numbers.filter(client_id=options["client"])
+
+        if options["verify"]:
+            self.verify(numbers)
+            return
+
+        with transaction.atomic():
+            updated = numbers.refresh_balances()
+            refresh_worklists(numbers)
+            invalidate_dashboard(numbers.values_list("client__user_client_id", flat=True).distinct())
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stored balances for {updated} numbers."))
+
+    def verify(self, numbers):
+        ledger = numbers.with_ledger_totals().annotate(
+            ledger_balance=F("ledger_invoice_total") - F("ledger_payment_total"),
+        )
+
+        mismatched = 0
+        for n in ledger.iterator(chunk_size=2000):
+            if (
+                n.running_balance != n.ledger_balance
+                or n.last_invoice_at != n.ledger_last_invoice_at
+                or n.last_payment_at != n.ledger_last_payment_at
+            ):
+                mismatched += 1
+                self.stdout.write(
+                    f"{n.number}: stored {n.running_balance}, ledger {n.ledger_balance}"
+                )
+
+        if mismatched:
+            self.stdout.write(self.style.ERROR(
+                f"{mismatched} numbers out of sync. Run without --verify to rebuild."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("All stored balances match the ledger."))
@@ -1,45 +1,134 @@
 # management/commands/seed_phil_loc.py
+import time
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from phil_loc.models import Region as PhilRegion, Province as PhilProvince, Municipality as PhilMunicipality, Barangay as PhilBarangay
 from clientside.models import Region, Province, Municipality, Barangay
+from clientside.locations import invalidate_location_cache
 
 
 class Command(BaseCommand):
     help = "Seed custom location models using phil_loc without preserving IDs (Option B)."
 
-    @transaction.atomic
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be created per level without writing anything.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows per bulk INSERT.",
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write(self.style.WARNING("Starting phil_loc → custom models sync..."))
-
-        # --- Regions ---
-        self.stdout.write("Seeding Regions...")
-        region_map = {}
-        for r in PhilRegion.objects.all():
-            obj, _ = Region.objects.get_or_create(name=r.name)
-            region_map[r.reg_code] = obj
-
-        # --- Provinces ---
-        self.stdout.write("Seeding Provinces...")
-        province_map = {}
-        for p in PhilProvince.objects.all():
-            parent_region = region_map.get(p.reg_code)
-            obj, _ = Province.objects.get_or_create(name=p.name, region=parent_region)
-            province_map[p.prov_code] = obj
-
-        # --- Municipalities ---
-        self.stdout.write("Seeding Municipalities...")
-        municipality_map = {}
-        for m in PhilMunicipality.objects.all():
-            parent_province = province_map.get(m.prov_code)
-            obj, _ = Municipality.objects.get_or_create(name=m.name, province=parent_province)
-            municipality_map[m.city_mun_code] = obj
-
-        # --- Barangays ---
-        self.stdout.write("Seeding Barangays...")
-        for b in PhilBarangay.objects.all():
-            parent_muni = municipality_map.get(b.city_mun_code)
-            Barangay.objects.get_or_create(name=b.name, municipality=parent_muni)
-
-        self.stdout.write(self.style.SUCCESS("Seeding complete. IDs auto-generated safely."))
+        self.dry_run = options["dry_run"]
+        self.batch_size = options["batch_size"]
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING("Dry run: comparing phil_loc with custom models..."))
+        else:
+            self.stdout.write(self.style.WARNING("Starting phil_loc → custom models sync..."))
+
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            # --- Regions ---
+            region_map = self.seed_level(
+                "Regions", Region, None,
+                PhilRegion.objects.order_by().values_list("reg_code", "name", "reg_code"),
+                None,
+            )
+
+            # --- Provinces ---
+            province_map = self.seed_level(
+                "Provinces", Province, "region",
+                PhilProvince.objects.order_by().values_list("prov_code", "name", "reg_code"),
+                region_map,
+            )
+
+            # --- Municipalities ---
+            municipality_map = self.seed_level(
+                "Municipalities", Municipality, "province",
+                PhilMunicipality.objects.order_by().values_list("city_mun_code", "name", "prov_code"),
+                province_map,
+            )
+
+            # --- Barangays ---
+            self.seed_level(
+                "Barangays", Barangay, "municipality",
+                PhilBarangay.objects.order_by().values_list("brgy_code", "name", "city_mun_code"),
+                municipality_map,
+            )
+
+        total = time.perf_counter() - started
+        if self.dry_run:
+            self.stdout.write(self.style.SUCCESS(f"Dry run complete in {total:.2f}s. Nothing was written."))
+        else:
+            # Cached dropdown fragments and ETags are keyed on this version
+            invalidate_location_cache()
+            self.stdout.write(self.style.SUCCESS(f"Seeding complete in {total:.2f}s. IDs auto-generated safely."))
+
+    def seed_level(self, label, model, parent_field, source_rows, parent_map):
+        """
+        Create the rows of one level that are not there yet, matched on (name, parent).
+
+        Returns {phil_loc code: custom model id} for the next level. In dry-run mode
+        rows that would be created get placeholder ids so their children count as new.
+        """
+        started = time.perf_counter()
+        parent_column = f"{parent_field}_id" if parent_field else None
+
+        def load_existing():
+            columns = ["id", "name"] + ([parent_column] if parent_column else [])
+            return {
+                (row[1], row[2] if parent_column else None): row[0]
+                for row in model.objects.order_by().values_list(*columns)
+            }
+
+        existing = load_existing()
+        code_map = {}
+        pending = {}      # (name, parent_id) -> [codes]
+        source = orphans = 0
+
+        for code, name, parent_code in source_rows.iterator(chunk_size=self.batch_size):
+            source += 1
+            parent_id = parent_map.get(parent_code) if parent_map is not None else None
+            if parent_map is not None and parent_id is None:
+                orphans += 1
+                continue
+
+            key = (name, parent_id)
+            if key in existing:
+                code_map[code] = existing[key]
+            else:
+                pending.setdefault(key, []).append(code)
+
+        if self.dry_run:
+            for key, codes in pending.items():
+                for code in codes:
+                    code_map[code] = ("new", label, key)
+        elif pending:
+            model.objects.bulk_create(
+                [
+                    model(name=name, **({parent_column: parent_id} if parent_column else {}))
+                    for name, parent_id in pending
+                ],
+                batch_size=self.batch_size,
+            )
+            existing = load_existing()
+            for key, codes in pending.items():
+                for code in codes:
+                    code_map[code] = existing[key]
+
+        verb = "would create" if self.dry_run else "created"
+        self.stdout.write(
+            f"{label}: {source} in phil_loc, {source - orphans - sum(map(len, pending.values()))} already present, "
+            f"{len(pending)} {verb}, {orphans} skipped without parent "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        return code_map
@@ -0,0 +1,134 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .queries import QueryRecorder, format_report, query_reports
+from .timing import current_timing, end_request, install_hooks, request_stats, start_request
+
+
+timing_logger = logging.getLogger("clientside.timing")
+queries_logger = logging.getLogger("clientside.queries")
+
+
+class TimingMiddleware:
+    """
+    Base for the two timing middlewares: raises MiddlewareNotUsed when both
+    REQUEST_TIMING and QUERY_INSPECTOR are off, so Django drops it from the stack and
+    a disabled install costs nothing. Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not (settings.REQUEST_TIMING or settings.QUERY_INSPECTOR):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class RequestTimingMiddleware(TimingMiddleware):
+    """
+    First in MIDDLEWARE. Times the whole request, counts and times its SQL, then adds
+    a Server-Timing header, logs one JSON line to "clientside.timing" and folds the
+    numbers into the per-URL stats. Under QUERY_INSPECTOR it also records every
+    statement and files the request's query report.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Normally done in AppConfig.ready(); covers REQUEST_TIMING switched on later
+        install_hooks()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        timing, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timing)
+
+    def start(self):
+        timing, token = start_request()
+        if settings.QUERY_INSPECTOR:
+            timing.recorder = QueryRecorder(timing)
+        return timing, token
+
+    def finish(self, request, response, timing):
+        timing.finish()
+        if timing.recorder is not None:
+            self.file_report(request, response, timing.recorder)
+        if not settings.REQUEST_TIMING:
+            return response
+
+        response["Server-Timing"] = timing.server_timing()
+
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match else "unresolved"
+        request_stats.record(route, timing)
+
+        timing_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "total_ms": round(timing.total_ms, 2),
+            "view_ms": round(timing.view_ms, 2),
+            "template_ms": round(timing.template_ms, 2),
+            "sql_ms": round(timing.sql_ms, 2),
+            "sql_count": timing.sql_count,
+        }))
+        return response
+
+    def file_report(self, request, response, recorder):
+        report = recorder.report(request, response)
+        query_reports.add(report)
+        # Quiet requests at DEBUG; repeated shapes (likely N+1) and slow statements at WARNING
+        level = logging.WARNING if report["repeated"] or report["slow"] else logging.DEBUG
+        if queries_logger.isEnabledFor(level):
+            queries_logger.log(level, format_report(report))
+
+
+class ViewTimingMiddleware(TimingMiddleware):
+    """
+    Last in MIDDLEWARE, so what it wraps is URL resolution, the view and any
+    TemplateResponse rendering: the "view" part of the request's timing.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            self.record(started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.record(started)
+
+    def record(self, started):
+        timing = current_timing()
+        if timing is not None:
+            timing.view_ms += (time.perf_counter() - started) * 1000
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2025-12-02 09:14
+
+from django.db import migrations, models
+from django.db.models import DecimalField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_running_balance(apps, schema_editor):
+    Number = apps.get_model('clientside', 'Number')
+    Invoice = apps.get_model('clientside', 'Invoice')
+    Payment = apps.get_model('clientside', 'Payment')
+
+    invoices = Invoice.objects.filter(number=OuterRef('pk')).order_by().values('number')
+    payments = Payment.objects.filter(number=OuterRef('pk')).order_by().values('number')
+    zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+
+    Number.objects.update(
+        running_balance=(
+            Coalesce(Subquery(invoices.annotate(total=Sum('balance')).values('total')), zero)
+            - Coalesce(Subquery(payments.annotate(total=Sum('paid_amount')).values('total')), zero)
+        ),
+        last_invoice_at=Subquery(invoices.annotate(latest=Max('time')).values('latest')),
+        last_payment_at=Subquery(payments.annotate(latest=Max('time')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0002_alter_number_collection_day'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='number',
+            name='last_invoice_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='number',
+            name='last_payment_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='number',
+            name='running_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_running_balance, migrations.RunPython.noop),
+    ]
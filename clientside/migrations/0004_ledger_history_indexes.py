@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2025-12-03 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0003_number_running_balance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['number', 'time', 'id'], name='invoice_number_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['number', 'time', 'id'], name='payment_number_time_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2025-12-05 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0004_ledger_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='reference_number',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='reference_number',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2025-12-08 10:21
+
+from django.db import migrations, models
+from django.db.models import CharField
+from django.db.models.functions import Cast, Right
+
+
+def backfill_digits(apps, schema_editor):
+    # `number` never keeps a leading 0 or country code, so its text form is already canonical
+    Number = apps.get_model('clientside', 'Number')
+    Number.objects.update(
+        digits=Cast('number', output_field=CharField(max_length=15)),
+        last_four=Right(Cast('number', output_field=CharField(max_length=15)), 4),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0005_payment_reference_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='number',
+            name='digits',
+            field=models.CharField(default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='number',
+            name='last_four',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=4),
+        ),
+        migrations.AlterField(
+            model_name='number',
+            name='number',
+            field=models.BigIntegerField(unique=True),
+        ),
+        migrations.RunPython(backfill_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='number',
+            index=models.Index(fields=['digits'], name='number_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
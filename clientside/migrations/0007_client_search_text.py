@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2025-12-10 16:02
+
+from django.db import migrations, models
+
+
+def backfill_search_text(apps, schema_editor):
+    Client = apps.get_model('clientside', 'Client')
+
+    clients = list(
+        Client.objects.select_related('primary_address__barangay', 'primary_address__municipality')
+        .prefetch_related('handler_set')
+    )
+    for client in clients:
+        parts = [client.name, client.trade_name]
+        parts += [handler.name for handler in client.handler_set.all()]
+
+        address = client.primary_address
+        if address is not None:
+            parts += [
+                address.barangay.name if address.barangay else '',
+                address.municipality.name if address.municipality else '',
+            ]
+        client.search_text = " ".join(" ".join(parts).lower().split())
+
+    Client.objects.bulk_update(clients, ['search_text'], batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    # GIN + gin_trgm_ops serves both the <% word-similarity operator and LIKE '%...%'
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS client_search_text_trgm_idx "
+        "ON clientside_client USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS client_search_text_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0006_number_digits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
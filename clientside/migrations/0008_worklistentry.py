@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2025-12-12 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_worklists(apps, schema_editor):
+    # Same rows as clientside.worklists.refresh_worklists(), so the dashboard works before the first nightly build
+    Number = apps.get_model('clientside', 'Number')
+    WorklistEntry = apps.get_model('clientside', 'WorklistEntry')
+
+    rows = Number.objects.filter(sim_status='Active').values(
+        'collection_day', 'client_id', 'running_balance',
+        number_id=F('id'),
+        phone_number=F('number'),
+        user_id=F('client__user_client_id'),
+        client_name=F('client__name'),
+        trade_name=F('client__trade_name'),
+        handler_name=F('handler__name'),
+        barangay=F('client__primary_address__barangay__name'),
+        municipality=F('client__primary_address__municipality__name'),
+    )
+
+    entries = []
+    for row in rows.iterator(chunk_size=2000):
+        barangay, municipality, balance = row.pop('barangay'), row.pop('municipality'), row.pop('running_balance')
+        entries.append(WorklistEntry(
+            **row,
+            address_label=", ".join(part for part in (barangay, municipality) if part),
+            due_balance=balance,
+        ))
+    WorklistEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientside', '0007_client_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorklistEntry',
+            fields=[
+                ('number', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='worklist_entry', serialize=False, to='clientside.number')),
+                ('collection_day', models.CharField(choices=[('Monday', 'Monday'), ('Tuesday', 'Tuesday'), ('Wednesday', 'Wednesday'), ('Thursday', 'Thursday'), ('Friday', 'Friday'), ('Saturday', 'Saturday'), ('Sunday', 'Sunday')], max_length=10)),
+                ('phone_number', models.BigIntegerField()),
+                ('client_name', models.CharField(max_length=50)),
+                ('trade_name', models.CharField(max_length=50)),
+                ('handler_name', models.CharField(max_length=50)),
+                ('address_label', models.CharField(blank=True, default='', max_length=255)),
+                ('due_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='worklist_entries', to='clientside.client')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='worklist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'collection_day', 'trade_name', 'phone_number'], name='worklist_user_day_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_worklists, migrations.RunPython.noop),
+    ]
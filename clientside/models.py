@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import connections, models, transaction
 import uuid
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
+from django.db.models import (
+    F, Q, Sum, Max, Count, Case, When, OuterRef, Subquery, Value, DecimalField, BooleanField,
+)
+from django.db.models.functions import Coalesce, Lower
 
 
 
@@ -62,6 +65,69 @@ class Address(models.Model):
 
 # Project Models
 
+class ClientQuerySet(models.QuerySet):
+
+    def with_portfolio_totals(self):
+        # Per-client number count, total balance and due status as one GROUP BY
+        zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+        return self.annotate(
+            client_numbers_count=Count('number'),
+            client_total_balance=Coalesce(Sum('number__running_balance'), zero),
+        ).annotate(
+            client_is_due=Case(
+                When(client_total_balance__gt=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+    def search(self, query):
+        """
+        Rank clients against ``query`` on their search_text.
+
+        On PostgreSQL this is a pg_trgm word-similarity match served by the GIN
+        index from migration 0007, so typos and partial words still hit. Other
+        backends (local SQLite) fall back to every word being a substring and a
+        name-first ranking.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return self.annotate(search_rank=Value(0.0)).order_by(Lower('name'), 'id')
+
+        if connections[self.db].vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramWordSimilarity
+
+            return self.filter(
+                Q(search_text__trigram_word_similar=query) | Q(search_text__contains=query)
+            ).annotate(
+                search_rank=TrigramWordSimilarity(query, 'search_text'),
+            ).order_by('-search_rank', Lower('name'), 'id')
+
+        matches = self
+        for word in query.split():
+            matches = matches.filter(search_text__contains=word)
+
+        return matches.annotate(
+            search_rank=Case(
+                When(name__istartswith=query, then=Value(3.0)),
+                When(trade_name__istartswith=query, then=Value(2.0)),
+                When(Q(name__icontains=query) | Q(trade_name__icontains=query), then=Value(1.0)),
+                default=Value(0.0),
+            ),
+        ).order_by('-search_rank', Lower('name'), 'id')
+
+    def refresh_search_text(self):
+        # Rebuild Client.search_text from the client, its handlers and its primary address
+        clients = list(
+            self.select_related('primary_address__barangay', 'primary_address__municipality')
+            .prefetch_related('handler_set')
+        )
+        for client in clients:
+            client.search_text = client.build_search_text()
+        self.model.objects.bulk_update(clients, ['search_text'], batch_size=1000)
+        return len(clients)
+
+
 class Client(models.Model):
     STATUS_CHOICES = [
         ("Active", "Active"),
@@ -91,17 +157,32 @@ class Client(models.Model):
         related_name='clients'
     )
 
+    # Lower-cased name, trade name, handler names and barangay / municipality,
+    # rebuilt by clientside.signals; trigram-indexed on PostgreSQL (migration 0007)
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    objects = ClientQuerySet.as_manager()
+
+    def build_search_text(self):
+        parts = [self.name, self.trade_name]
+        parts += [handler.name for handler in self.handler_set.all()]
+
+        address = self.primary_address
+        if address is not None:
+            parts += [
+                address.barangay.name if address.barangay else '',
+                address.municipality.name if address.municipality else '',
+            ]
+        return " ".join(" ".join(parts).lower().split())
+
     @property
     def numbers_count(self):
         return self.number_set.count()
     
     @property
     def total_balance(self):
-        # Sum of all current_balance for all numbers of this client
-        total = 0
-        for number in self.number_set.all():
-            total += number.current_balance
-        return total
+        # Sum of the stored running balances of this client's numbers
+        return self.number_set.aggregate(total=Sum('running_balance'))['total'] or 0
 
     def __str__(self):
         return f"Client of { self.user_client.name } ----- { self.name } ----- { self.trade_name }"
@@ -128,6 +209,96 @@ class NumberOperatorIdentifier(models.Model):
         return f"{ self.operator.name } --- { self.number }"
 
 
+def ledger_expressions():
+    # Correlated subqueries over the raw Invoice / Payment ledger of the outer Number
+    invoices = Invoice.objects.filter(number=OuterRef('pk')).order_by().values('number')
+    payments = Payment.objects.filter(number=OuterRef('pk')).order_by().values('number')
+    zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+
+    return {
+        'invoice_total': Coalesce(Subquery(invoices.annotate(total=Sum('balance')).values('total')), zero),
+        'payment_total': Coalesce(Subquery(payments.annotate(total=Sum('paid_amount')).values('total')), zero),
+        'last_invoice_at': Subquery(invoices.annotate(latest=Max('time')).values('latest')),
+        'last_payment_at': Subquery(payments.annotate(latest=Max('time')).values('latest')),
+    }
+
+
+def typed_digits(value):
+    # Digits as entered, country code dropped: +63 917 123 4567 / 639171234567 → 9171234567
+    raw = str(value).strip()
+    if raw.startswith("+63"):
+        raw = raw[3:]
+
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    if len(digits) == 12 and digits.startswith("63"):
+        digits = digits[2:]
+    return digits
+
+
+def canonical_digits(value):
+    # 639171234567 / +63 917 123 4567 / 09171234567 → 9171234567
+    return typed_digits(value).lstrip("0")
+
+
+class NumberQuerySet(models.QuerySet):
+
+    def search_digits(self, query):
+        """
+        Match a full or partial number as typed by a collector.
+
+        Any input matches as a prefix of the canonical digits. Four digits or
+        fewer also match the end of the number, which is how collectors usually
+        read a SIM back ("the one ending in 4567"). The ending is matched as
+        typed: leading zeros only belong to the national prefix, not to "0456".
+        """
+        typed = typed_digits(query)
+        digits = typed.lstrip("0")
+
+        match = Q()
+        if digits:
+            match |= Q(digits__startswith=digits)
+        if len(typed) == 4:
+            match |= Q(last_four=typed)
+        elif 0 < len(typed) < 4:
+            match |= Q(last_four__endswith=typed)
+
+        if not match:
+            return self.none()
+        return self.filter(match)
+
+    def with_ledger_totals(self):
+        ledger = ledger_expressions()
+        return self.annotate(
+            ledger_invoice_total=ledger['invoice_total'],
+            ledger_payment_total=ledger['payment_total'],
+            ledger_last_invoice_at=ledger['last_invoice_at'],
+            ledger_last_payment_at=ledger['last_payment_at'],
+        )
+
+    def with_due_balance(self, source='stored'):
+        # 'stored' reads Number.running_balance, 'ledger' sums Invoice / Payment in subqueries
+        if source == 'ledger':
+            ledger = ledger_expressions()
+            return self.annotate(due_balance=ledger['invoice_total'] - ledger['payment_total'])
+        return self.annotate(due_balance=F('running_balance'))
+
+    def refresh_balances(self):
+        # Recompute the stored columns from the ledger in a single UPDATE.
+        # The rows are locked first: under READ COMMITTED the UPDATE's SUM subqueries
+        # read the snapshot its statement started with, so two transactions posting to
+        # the same number could each miss the other's row. A writer that waits here
+        # starts its UPDATE after the other one commits, and sees its row.
+        ledger = ledger_expressions()
+        with transaction.atomic(using=self.db):
+            # pk order, so two bulk refreshes cannot deadlock on overlapping numbers
+            list(self.select_for_update(of=('self',)).order_by('pk').values_list('pk', flat=True))
+            return self.update(
+                running_balance=ledger['invoice_total'] - ledger['payment_total'],
+                last_invoice_at=ledger['last_invoice_at'],
+                last_payment_at=ledger['last_payment_at'],
+            )
+
+
 class Number(models.Model):
 
     SIM_STATUS_CHOICES = [
@@ -147,18 +318,53 @@ class Number(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    number = models.IntegerField(unique=True)
+    number = models.BigIntegerField(unique=True)
+    # Canonical digit string of `number` for indexed prefix / last-four search, set in save()
+    digits = models.CharField(max_length=15, editable=False, default='')
+    last_four = models.CharField(max_length=4, editable=False, default='', db_index=True)
     sim_status = models.CharField(max_length=10, choices=SIM_STATUS_CHOICES, default="Active")
     operator = models.ForeignKey(Operator, on_delete=models.CASCADE)
     client = models.ForeignKey(Client, on_delete=models.CASCADE)
     handler = models.ForeignKey(Handler, on_delete=models.CASCADE)
     collection_day = models.CharField(max_length=10, choices=COLLECTION_DAY_CHOICES)
 
+    # Materialized from Invoice / Payment rows, kept current by clientside.signals
+    running_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_invoice_at = models.DateTimeField(null=True, blank=True)
+    last_payment_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NumberQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # varchar_pattern_ops lets PostgreSQL use the index for LIKE 'prefix%'
+            models.Index(fields=['digits'], name='number_digits_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def sync_digits(self):
+        # bulk_create() skips save(), so bulk paths call this directly
+        self.digits = canonical_digits(self.number)
+        self.last_four = self.digits[-4:]
+
+    def save(self, *args, **kwargs):
+        self.sync_digits()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'number' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'digits', 'last_four'}
+        super().save(*args, **kwargs)
+
     @property
     def current_balance(self):
-        total_invoice = self.invoices.aggregate(total=Sum('balance'))['total'] or 0
-        total_payment = self.payments.aggregate(total=Sum('paid_amount'))['total'] or 0
-        return total_invoice - total_payment
+        return self.running_balance
+
+    @property
+    def last_activity_at(self):
+        times = [t for t in (self.last_invoice_at, self.last_payment_at) if t]
+        return max(times) if times else None
+
+    def refresh_balance(self):
+        Number.objects.filter(pk=self.pk).refresh_balances()
+        self.refresh_from_db(fields=['running_balance', 'last_invoice_at', 'last_payment_at'])
 
     def __str__(self):
         return f"{ self.number } ----- { self.operator.name } ----- { self.client.name } -----{ self.client.user_client }"
@@ -171,7 +377,13 @@ class Invoice(models.Model):
     time = models.DateTimeField(auto_now_add=False)
     added_load = models.DecimalField(max_digits=10, decimal_places=2)
     balance = models.DecimalField(max_digits=10, decimal_places=2)
-    reference_number = models.CharField(max_length=100)
+    reference_number = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination / range scans over one number's history
+            models.Index(fields=['number', 'time', 'id'], name='invoice_number_time_idx'),
+        ]
 
     def __str__(self):
         return f"Invoice {self.id}"
@@ -181,6 +393,13 @@ class Payment(models.Model):
     number = models.ForeignKey(Number, on_delete=models.CASCADE, related_name="payments")
     time = models.DateTimeField(auto_now_add=False)
     paid_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # Collection reference from reconciliation files; blank for manual entries
+    reference_number = models.CharField(max_length=100, blank=True, default='', db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['number', 'time', 'id'], name='payment_number_time_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.id}"
@@ -193,3 +412,33 @@ class Payment(models.Model):
 
 
 
+
+
+# Precomputed
+class WorklistEntry(models.Model):
+    """
+    One dashboard row per active Number, denormalized so the prev / today / next
+    dashboard is a single indexed read. Built by the build_worklists command and
+    refreshed per number by clientside.signals (see clientside.worklists).
+    """
+    number = models.OneToOneField(Number, on_delete=models.CASCADE, primary_key=True, related_name="worklist_entry")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="worklist_entries")
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="worklist_entries")
+    collection_day = models.CharField(max_length=10, choices=Number.COLLECTION_DAY_CHOICES)
+
+    phone_number = models.BigIntegerField()
+    client_name = models.CharField(max_length=50)
+    trade_name = models.CharField(max_length=50)
+    handler_name = models.CharField(max_length=50)
+    address_label = models.CharField(max_length=255, blank=True, default='')
+    due_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Dashboard read: WHERE user / collection_day ORDER BY trade_name, phone_number
+            models.Index(fields=['user', 'collection_day', 'trade_name', 'phone_number'], name='worklist_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{ self.collection_day } ----- { self.phone_number } ----- { self.trade_name }"
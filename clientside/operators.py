@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import NumberOperatorIdentifier
+
+
+OPERATOR_PREFIX_TTL = 300      # seconds before the prefix table is re-read anyway
+OPERATOR_PREFIX_VERSION_KEY = "operators:prefixes:version"
+
+
+def normalize_number(raw):
+    raw = str(raw).strip()
+
+    # +63XXXXXXXXXX → remove +63
+    if raw.startswith("+63"):
+        raw = raw[3:]
+
+    # 09XXXXXXXXX → drop leading 0
+    if raw.startswith("0") and len(raw) == 11:
+        raw = raw[1:]
+
+    return raw
+
+
+class OperatorPrefixResolver:
+    """
+    Process-wide, in-memory copy of the NumberOperatorIdentifier table.
+
+    Numbers are matched against the longest known prefix first. The table is
+    loaded on first use and tagged with a version stamp kept in the shared cache;
+    clientside.signals bump the stamp whenever an Operator or identifier changes
+    (populate_operator, the admin), and every process reloads on its next lookup.
+    OPERATOR_PREFIX_TTL is only a backstop.
+    """
+
+    def __init__(self, ttl=OPERATOR_PREFIX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._prefixes = None
+        self._lengths = ()
+        self._loaded_at = 0.0
+        self._version = None
+
+    def version(self):
+        version = cache.get(OPERATOR_PREFIX_VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            cache.add(OPERATOR_PREFIX_VERSION_KEY, version, None)
+            version = cache.get(OPERATOR_PREFIX_VERSION_KEY, version)
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self._prefixes = None
+        # After commit, so no process can reload the table before the change is visible
+        transaction.on_commit(lambda: cache.set(OPERATOR_PREFIX_VERSION_KEY, time.time_ns(), None))
+
+    def _table(self):
+        version = self.version()
+        with self._lock:
+            if (
+                self._prefixes is None
+                or self._version != version
+                or time.monotonic() - self._loaded_at > self.ttl
+            ):
+                prefixes = {}
+                identifiers = NumberOperatorIdentifier.objects.order_by("id").values_list("number", "operator_id")
+                for prefix, operator_id in identifiers:
+                    # A prefix listed under two operators resolves to the first one entered
+                    prefixes.setdefault(str(prefix), operator_id)
+                self._prefixes = prefixes
+                self._lengths = sorted({len(p) for p in prefixes}, reverse=True)
+                self._loaded_at = time.monotonic()
+                self._version = version
+            return self._prefixes, self._lengths
+
+    def _match(self, digits, prefixes, lengths):
+        for length in lengths:
+            operator_id = prefixes.get(digits[:length])
+            if operator_id is not None:
+                return operator_id
+        return None
+
+    def resolve(self, raw):
+        """Operator id for one raw number, or None if no prefix matches."""
+        prefixes, lengths = self._table()
+        return self._match(normalize_number(raw).lstrip("0"), prefixes, lengths)
+
+    def resolve_many(self, raws):
+        """Map each raw number to its operator id (or None) against a single table snapshot."""
+        prefixes, lengths = self._table()
+        return {
+            raw: self._match(normalize_number(raw).lstrip("0"), prefixes, lengths)
+            for raw in raws
+        }
+
+
+prefix_resolver = OperatorPrefixResolver()
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+
+# Query inspector for development and staging (QUERY_INSPECTOR). Records every
+# statement a request runs, groups them by normalized SQL and the project code that
+# issued them, flags shapes repeated within one request (the N+1 pattern) and
+# EXPLAINs anything slower than QUERY_INSPECTOR_SLOW_MS. The middleware turns each
+# request's recorder into a report: logged to "clientside.queries" and kept in
+# query_reports for the staff page.
+
+QUERY_REPORTS_KEPT = 50        # recent reports held in memory per process
+CALL_SITE_DEPTH = 3            # project frames kept per statement
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_SPACE = re.compile(r"\s+")
+
+EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+}
+
+# The inspector's own frames say nothing about where a query came from
+_SKIP_FILES = {
+    __file__,
+    str(Path(__file__).with_name("timing.py")),
+    str(Path(__file__).with_name("middleware.py")),
+    str(Path(settings.BASE_DIR) / "manage.py"),
+}
+
+
+def normalize_sql(sql):
+    """Statement shape: literals and parameters become ?, IN lists collapse to (...)."""
+    shape = _STRING.sub("?", sql)
+    shape = _NUMBER.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def call_site(depth=CALL_SITE_DEPTH):
+    """Innermost project frames (outside site-packages) that led to the statement."""
+    base = str(settings.BASE_DIR)
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        if not frame.filename.startswith(base) or frame.filename in _SKIP_FILES:
+            continue
+        if "site-packages" in frame.filename:
+            continue
+        frames.append(f"{Path(frame.filename).relative_to(base)}:{frame.lineno} in {frame.name}")
+        if len(frames) == depth:
+            break
+    return tuple(frames)
+
+
+class QueryRecorder:
+    """Statements of one request; attached to its RequestTiming by the middleware."""
+
+    def __init__(self, timing):
+        self.timing = timing
+        self.slow_ms = settings.QUERY_INSPECTOR_SLOW_MS
+        self.repeat = settings.QUERY_INSPECTOR_REPEAT
+        self.statements = []
+        self.slow = []
+        self.explained = set()
+
+    def record(self, sql, params, many, elapsed_ms, connection):
+        shape = normalize_sql(sql)
+        stack = call_site()
+        self.statements.append((shape, stack, sql, elapsed_ms))
+
+        if elapsed_ms >= self.slow_ms:
+            # One plan per shape: a slow N+1 would otherwise EXPLAIN every row
+            plan = None
+            if not many and shape not in self.explained:
+                self.explained.add(shape)
+                plan = self.explain(connection, sql, params)
+            self.slow.append({
+                "sql": sql,
+                "params": None if many else params,
+                "ms": elapsed_ms,
+                "stack": stack,
+                "plan": plan,
+            })
+
+    def explain(self, connection, sql, params):
+        prefix = EXPLAIN_PREFIX.get(connection.vendor)
+        if prefix is None or not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+
+        # The EXPLAIN itself goes through the execute wrapper; keep it out of the counts
+        self.timing.paused = True
+        try:
+            # Savepoint, so a failed EXPLAIN cannot poison the request's transaction
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        except DatabaseError as e:
+            return f"EXPLAIN failed: {e}"
+        finally:
+            self.timing.paused = False
+
+    def groups(self):
+        """One entry per (shape, call site), most executed first."""
+        grouped = {}
+        for shape, stack, sql, elapsed_ms in self.statements:
+            group = grouped.get((shape, stack))
+            if group is None:
+                group = grouped[shape, stack] = {
+                    "shape": shape, "stack": stack, "example": sql, "count": 0, "ms": 0.0,
+                }
+            group["count"] += 1
+            group["ms"] += elapsed_ms
+
+        groups = sorted(grouped.values(), key=lambda g: (g["count"], g["ms"]), reverse=True)
+        for group in groups:
+            group["repeated"] = group["count"] >= self.repeat
+        return groups
+
+    def report(self, request, response):
+        match = getattr(request, "resolver_match", None)
+        groups = self.groups()
+        return {
+            "time": time.time(),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "route": match.view_name if match else "unresolved",
+            "status": response.status_code,
+            "queries": len(self.statements),
+            "sql_ms": sum(ms for *_, ms in self.statements),
+            "groups": groups,
+            "repeated": [g for g in groups if g["repeated"]],
+            "slow": self.slow,
+        }
+
+
+def format_report(report):
+    lines = [
+        f"{report['method']} {report['path']} ({report['route']}) {report['status']}: "
+        f"{report['queries']} queries, {report['sql_ms']:.1f} ms SQL",
+    ]
+    for group in report["groups"]:
+        flag = "  REPEATED" if group["repeated"] else ""
+        lines.append(f"  {group['count']:>4}x {group['ms']:>8.1f} ms  {group['shape']}{flag}")
+        for frame in group["stack"] or ["(middleware / framework)"]:
+            lines.append(f"                      {frame}")
+    for slow in report["slow"]:
+        lines.append(f"  SLOW {slow['ms']:.1f} ms: {slow['sql']}")
+        lines.append(f"    params: {slow['params']}")
+        for frame in slow["stack"]:
+            lines.append(f"    {frame}")
+        for plan_line in (slow["plan"] or "(no plan: not a SELECT, or same shape as above)").splitlines():
+            lines.append(f"    | {plan_line}")
+    return "\n".join(lines)
+
+
+class QueryReports:
+    """Most recent per-request reports of this process, newest first."""
+
+    def __init__(self, kept=QUERY_REPORTS_KEPT):
+        self._lock = threading.Lock()
+        self._reports = deque(maxlen=kept)
+
+    def add(self, report):
+        with self._lock:
+            self._reports.appendleft(report)
+
+    def all(self):
+        with self._lock:
+            return list(self._reports)
+
+    def clear(self):
+        with self._lock:
+            self._reports.clear()
+
+
+query_reports = QueryReports()
@@ -0,0 +1,138 @@
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Address, Client, Handler, Number, Invoice, Payment, Operator, NumberOperatorIdentifier
+from .operators import prefix_resolver
+from .worklists import refresh_worklists
+from .dashboard import (
+    invalidate_dashboard, invalidate_dashboard_for_clients, invalidate_dashboard_for_numbers,
+)
+
+
+# Keep Number.running_balance / last_*_at in step with the Invoice and Payment ledger.
+# bulk_create() and queryset.update() skip these signals, so bulk paths must call
+# Number.objects.filter(...).refresh_balances() themselves.
+
+@receiver(pre_save, sender=Invoice)
+@receiver(pre_save, sender=Payment)
+def remember_previous_number(sender, instance, **kwargs):
+    # An edit may move the row to another number; both sides need a refresh
+    instance._previous_number_id = None
+    if instance.pk:
+        instance._previous_number_id = (
+            sender.objects.filter(pk=instance.pk).values_list('number_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Payment)
+def refresh_balance_on_save(sender, instance, **kwargs):
+    number_ids = {instance.number_id, getattr(instance, '_previous_number_id', None)}
+    number_ids.discard(None)
+    Number.objects.filter(pk__in=number_ids).refresh_balances()
+
+
+def deleted_with_number(origin):
+    """
+    True when a ledger row is going as part of a Number / Client / user delete.
+    Refreshing would re-create WorklistEntry rows for a number that is being
+    deleted, and the delete would then fail its foreign key check at commit.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model not in (Invoice, Payment)
+
+
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Payment)
+def refresh_balance_on_delete(sender, instance, origin=None, **kwargs):
+    if origin is not None and deleted_with_number(origin):
+        return
+    Number.objects.filter(pk=instance.number_id).refresh_balances()
+
+
+@receiver(post_save, sender=Operator)
+@receiver(post_delete, sender=Operator)
+@receiver(post_save, sender=NumberOperatorIdentifier)
+@receiver(post_delete, sender=NumberOperatorIdentifier)
+def invalidate_operator_prefixes(sender, **kwargs):
+    prefix_resolver.invalidate()
+
+
+# Client.search_text denormalizes the client's handlers and primary address.
+
+@receiver(post_save, sender=Client)
+def refresh_search_text_on_client_save(sender, instance, **kwargs):
+    Client.objects.filter(pk=instance.pk).refresh_search_text()
+
+
+@receiver(post_save, sender=Handler)
+@receiver(post_delete, sender=Handler)
+def refresh_search_text_on_handler_change(sender, instance, **kwargs):
+    Client.objects.filter(pk=instance.client_handler_id).refresh_search_text()
+
+
+@receiver(post_save, sender=Address)
+def refresh_search_text_on_address_save(sender, instance, **kwargs):
+    Client.objects.filter(primary_address=instance).refresh_search_text()
+
+
+# WorklistEntry rows (clientside.worklists) are rebuilt per number. Receivers run in
+# connection order, so ledger changes see the refreshed running_balance.
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Payment)
+def refresh_worklist_on_ledger_change(sender, instance, origin=None, **kwargs):
+    if origin is not None and deleted_with_number(origin):
+        return
+    number_ids = {instance.number_id, getattr(instance, '_previous_number_id', None)}
+    number_ids.discard(None)
+    refresh_worklists(Number.objects.filter(pk__in=number_ids))
+
+
+@receiver(post_save, sender=Number)
+def refresh_worklist_on_number_save(sender, instance, **kwargs):
+    refresh_worklists(Number.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Handler)
+@receiver(post_delete, sender=Handler)
+@receiver(post_save, sender=Address)
+def refresh_worklist_on_client_change(sender, instance, **kwargs):
+    if sender is Client:
+        numbers = Number.objects.filter(client=instance)
+    elif sender is Handler:
+        numbers = Number.objects.filter(handler=instance)
+    else:
+        numbers = Number.objects.filter(client__primary_address=instance)
+    refresh_worklists(numbers)
+
+# Dashboard fragments (clientside.dashboard) are dropped per user on any change
+# to the rows they render.
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Payment)
+def invalidate_dashboard_on_ledger_change(sender, instance, **kwargs):
+    number_ids = {instance.number_id, getattr(instance, '_previous_number_id', None)}
+    number_ids.discard(None)
+    invalidate_dashboard_for_numbers(number_ids)
+
+
+@receiver(post_save, sender=Number)
+@receiver(post_delete, sender=Number)
+@receiver(post_save, sender=Handler)
+@receiver(post_delete, sender=Handler)
+def invalidate_dashboard_on_number_change(sender, instance, **kwargs):
+    client_id = instance.client_id if sender is Number else instance.client_handler_id
+    invalidate_dashboard_for_clients([client_id])
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_dashboard_on_client_change(sender, instance, **kwargs):
+    invalidate_dashboard([instance.user_client_id])
@@ -1,3 +1,1160 @@
-from django.test import TestCase
+import gzip
+import importlib
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import OperationalError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, get_resolver, resolve, reverse
+from django.utils import timezone
+from reportlab.platypus import Spacer, Table
+
+from LoadTracker.staticfiles import PrecompressedStaticFilesHandler
+
+from . import async_views, urls
+from .dashboard import dashboard_cache_stats, dashboard_cards, invalidate_dashboard
+from .health import database_health
+from .history import plan_history_page
+from .importers import import_ledger, import_numbers
+from .locations import invalidate_location_cache, location_index
+from .models import (
+    Address, Barangay, Client, Handler, Invoice, Municipality, Number, NumberOperatorIdentifier, Operator, Payment,
+    Province, Region, WorklistEntry,
+)
+from .operators import OperatorPrefixResolver
+from .queries import QueryRecorder, normalize_sql, query_reports
+from .statements import STATEMENT_ROWS_PER_TABLE, StatementDocTemplate, render_statement, statement_table
+from .timing import end_request, install_hooks, request_stats, start_request
+from .worklists import refresh_worklists
+
+
+# The configured cache is the shared on-disk CACHE_DIR of the running app; tests get a
+# private in-memory one, so cache.clear() here never drops live lockouts or version stamps
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "clientside-tests",
+    }
+}
+_test_caches = override_settings(CACHES=TEST_CACHES)
+
+
+def setUpModule():
+    _test_caches.enable()
+
+
+def tearDownModule():
+    _test_caches.disable()
+
+
+# Portfolio sizes each view is rendered at; the query count must not move between them
+DATA_SIZES = (1, 4, 12)
+
+# url name: most queries one logged-in GET may run, session read / user / session save
+# included. Every name in clientside.urls needs an entry. Lower a budget when a view
+# gets cheaper; raising one needs a reason in the commit message.
+QUERY_BUDGETS = {
+    "index": 3,
+    "healthz": 3,
+    "login": 3,
+    "user-logout": 4,
+    "dashboard": 4,
+    "clients": 5,
+    "search-clients": 5,
+    "create-client": 4,
+    "client-detail": 7,
+    "add-handler": 4,
+    "list-handler": 5,
+    "edit-handler": 5,
+    "add-number": 5,
+    "import-numbers": 4,
+    "number-search": 5,
+    "number-page": 3,
+    "number-detail": 4,
+    "edit-number": 5,
+    "add-invoice": 4,
+    "add-payment": 4,
+    "print_number_history": 5,
+    "search-number": 5,
+    "payment-page": 3,
+    "hx-history-table": 5,
+    "load-provinces": 5,
+    "load-municipalities": 5,
+    "load-barangays": 5,
+    "request-stats": 3,
+    "query-reports": 3,
+}
+
+
+class PortfolioBuilder:
+    """Grows one collector's portfolio: clients with addresses, handlers, numbers and ledger rows."""
+
+    def __init__(self, user):
+        self.user = user
+        self.region = Region.objects.create(name="Region I")
+        self.province = Province.objects.create(region=self.region, name="Pangasinan")
+        self.municipality = Municipality.objects.create(province=self.province, name="Dagupan")
+        self.barangay = Barangay.objects.create(municipality=self.municipality, name="Poblacion")
+        self.operator = Operator.objects.create(name="Globe")
+        self.clients = []
+        self.numbers = []
+
+    def grow_to(self, size):
+        # `size` clients, each with `size` numbers and `size` invoices / payments per number
+        for n in range(len(self.clients), size):
+            self.add_client(n)
+        for client in self.clients:
+            for n in range(client.handler_set.count(), size):
+                Handler.objects.create(name=f"Handler {n}", contact=912000000 + n, client_handler=client)
+            have = [number for number in self.numbers if number.client_id == client.id]
+            for n in range(len(have), size):
+                self.add_number(client, n)
+
+        now = timezone.now()
+        invoices, payments = [], []
+        for number in self.numbers:
+            for n in range(number.invoices.count(), size):
+                invoices.append(Invoice(
+                    number=number, time=now - timedelta(days=n), added_load=Decimal("100"),
+                    balance=Decimal("100"), reference_number=f"INV-{number.number}-{n}",
+                ))
+                payments.append(Payment(
+                    number=number, time=now - timedelta(days=n, hours=-1), paid_amount=Decimal("60"),
+                ))
+        Invoice.objects.bulk_create(invoices)
+        Payment.objects.bulk_create(payments)
+
+        # bulk_create() skips the signals, same as the importers
+        numbers = Number.objects.filter(client__user_client=self.user)
+        numbers.refresh_balances()
+        refresh_worklists(numbers)
+
+    def add_client(self, n):
+        address = Address.objects.create(
+            region=self.region, province=self.province, municipality=self.municipality,
+            barangay=self.barangay, house_number_street=f"{n} Rizal St",
+        )
+        client = Client.objects.create(
+            name=f"Owner {n}", trade_name=f"Store {n}", contact_number=912345670 + n, status="Active",
+            primary_address=address, application_date=timezone.localdate(), user_client=self.user,
+        )
+        self.clients.append(client)
+
+    def add_number(self, client, n):
+        # Every number gets its own handler, so a per-row handler lookup cannot hide in one cached row
+        handlers = list(client.handler_set.order_by("id"))
+        number = Number.objects.create(
+            number=9170000000 + len(self.numbers), operator=self.operator, client=client,
+            handler=handlers[n % len(handlers)], collection_day=timezone.localdate().strftime("%A"),
+        )
+        self.numbers.append(number)
+
+
+class BalanceSignalTests(TestCase):
+    """Number.running_balance / last_*_at follow every single-row ledger change (clientside.signals)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="collector", password="secret")
+        portfolio = PortfolioBuilder(user)
+        portfolio.add_client(0)
+        client = portfolio.clients[0]
+        handler = Handler.objects.create(name="Handler", contact=912000000, client_handler=client)
+        cls.first, cls.second = [
+            Number.objects.create(
+                number=number, operator=portfolio.operator, client=client, handler=handler, collection_day="Monday",
+            )
+            for number in (9171112222, 9173334444)
+        ]
+
+    def setUp(self):
+        self.invoiced_at = timezone.now() - timedelta(days=2)
+        self.paid_at = timezone.now() - timedelta(days=1)
+        self.invoice = Invoice.objects.create(
+            number=self.first, time=self.invoiced_at, added_load=Decimal("100"),
+            balance=Decimal("100"), reference_number="INV-1",
+        )
+        self.payment = Payment.objects.create(number=self.first, time=self.paid_at, paid_amount=Decimal("40"))
+
+    def assertStored(self, number, balance, last_invoice_at, last_payment_at):
+        number.refresh_from_db()
+        self.assertEqual(
+            (number.running_balance, number.last_invoice_at, number.last_payment_at),
+            (Decimal(balance), last_invoice_at, last_payment_at),
+        )
+
+    def test_create(self):
+        self.assertStored(self.first, "60", self.invoiced_at, self.paid_at)
+        self.assertStored(self.second, "0", None, None)
+
+    def test_edit(self):
+        self.invoice.balance = Decimal("150")
+        self.invoice.save()
+        self.payment.time = self.paid_at + timedelta(hours=1)
+        self.payment.save()
+
+        self.assertStored(self.first, "110", self.invoiced_at, self.paid_at + timedelta(hours=1))
+
+    def test_edit_moves_rows_to_another_number(self):
+        # Both the number the row left and the one it joined are refreshed
+        self.payment.number = self.second
+        self.payment.save()
+        self.assertStored(self.first, "100", self.invoiced_at, None)
+        self.assertStored(self.second, "-40", None, self.paid_at)
+
+        invoice = Invoice.objects.get(pk=self.invoice.pk)
+        invoice.number = self.second
+        invoice.save()
+        self.assertStored(self.first, "0", None, None)
+        self.assertStored(self.second, "60", self.invoiced_at, self.paid_at)
+
+    def test_delete(self):
+        self.payment.delete()
+        self.assertStored(self.first, "100", self.invoiced_at, None)
+
+        self.invoice.delete()
+        self.assertStored(self.first, "0", None, None)
+
+    def test_rebuild_balances_verify(self):
+        # queryset.update() skips the signals, like any bulk path that forgets refresh_balances()
+        Number.objects.filter(pk=self.first.pk).update(running_balance=Decimal("999"))
+
+        out = io.StringIO()
+        call_command("rebuild_balances", verify=True, stdout=out)
+        self.assertIn(f"{self.first.number}: stored 999.00, ledger 60", out.getvalue())
+        self.assertIn("1 numbers out of sync", out.getvalue())
+        self.assertStored(self.first, "999", self.invoiced_at, self.paid_at)
+
+        call_command("rebuild_balances", stdout=io.StringIO())
+        out = io.StringIO()
+        call_command("rebuild_balances", verify=True, stdout=out)
+        self.assertIn("All stored balances match the ledger.", out.getvalue())
+        self.assertStored(self.first, "60", self.invoiced_at, self.paid_at)
+
+
+class CascadeDeleteTests(TestCase):
+    """Deleting a number's owner takes its ledger and worklist rows along, without re-creating any."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+        cls.portfolio.grow_to(2)
+
+    def assertDeleted(self):
+        # SQLite checks foreign keys at commit; check them now, inside the test transaction
+        connection.check_constraints()
+        self.assertFalse(WorklistEntry.objects.filter(number__isnull=True).exists())
+
+    def test_delete_client_with_ledger(self):
+        client = self.portfolio.clients[0]
+        client_id = client.id
+        client.delete()
+
+        self.assertDeleted()
+        self.assertFalse(Number.objects.filter(client_id=client_id).exists())
+        self.assertFalse(WorklistEntry.objects.filter(client_id=client_id).exists())
+        self.assertTrue(WorklistEntry.objects.filter(client=self.portfolio.clients[1]).exists())
+
+    def test_delete_number_with_ledger(self):
+        number = self.portfolio.numbers[0]
+        number_id = number.id
+        number.delete()
+
+        self.assertDeleted()
+        self.assertFalse(WorklistEntry.objects.filter(number_id=number_id).exists())
+
+    def test_delete_ledger_rows_still_refreshes_the_number(self):
+        number = self.portfolio.numbers[0]
+        number.payments.all().delete()
+
+        number.refresh_from_db()
+        self.assertEqual(number.running_balance, Decimal("200"))
+        self.assertEqual(WorklistEntry.objects.get(number=number).due_balance, Decimal("200"))
+
+    def test_delete_user(self):
+        self.user.delete()
+
+        self.assertDeleted()
+        self.assertFalse(Number.objects.exists())
+        self.assertFalse(WorklistEntry.objects.exists())
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Pins the SQL each page runs. A view that goes N+1 (a template walking a relation
+    per row, a property that queries per number) fails here: the count grows with
+    DATA_SIZES, or the budget in QUERY_BUDGETS is exceeded.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.portfolio = PortfolioBuilder(self.user)
+
+    def url_for(self, name):
+        client = self.portfolio.clients[0]
+        number = self.portfolio.numbers[0]
+        today = timezone.localdate()
+        args = {
+            "client-detail": [client.id],
+            "add-handler": [client.id],
+            "list-handler": [client.id],
+            "edit-handler": [client.id, client.handler_set.first().id],
+            "add-number": [client.id],
+            "import-numbers": [client.id],
+            "number-search": [client.id],
+            "number-detail": [number.id],
+            "edit-number": [number.id],
+            "add-invoice": [number.id],
+            "add-payment": [number.id],
+            "hx-history-table": [number.id],
+            "print_number_history": [number.id, (today - timedelta(days=30)).isoformat(), today.isoformat()],
+        }
+        query = {
+            "search-number": "?q=917",
+            "search-clients": "?search=store",
+            "load-provinces": f"?region={self.portfolio.region.id}",
+            "load-municipalities": f"?province={self.portfolio.province.id}",
+            "load-barangays": f"?municipality={self.portfolio.municipality.id}",
+        }
+        return reverse(name, args=args.get(name)) + query.get(name, "")
+
+    def run_queries(self, name):
+        url = self.url_for(name)
+        headers = {"HTTP_HX_REQUEST": "true"} if name.startswith(("hx-", "search-")) else {}
+        # user-logout ends the session, so every request starts from a fresh login
+        self.client.force_login(self.user)
+        # Cold caches: the budget covers the expensive path, not a fragment-cache hit
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 302 if name == "user-logout" else 200, f"{url} returned {response.status_code}")
+        # SAVEPOINTs come from TestCase wrapping every atomic() block; production never sees them
+        return [q["sql"] for q in captured.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+    def test_every_url_has_a_budget(self):
+        names = {p.name for p in get_resolver("clientside.urls").url_patterns if p.name}
+        self.assertEqual(names - set(QUERY_BUDGETS), set(), "URLs without a query budget")
+        self.assertEqual(set(QUERY_BUDGETS) - names, set(), "Budgets for URLs that no longer exist")
+
+    def test_query_budgets(self):
+        counts = {name: {} for name in QUERY_BUDGETS}
+        for size in DATA_SIZES:
+            self.portfolio.grow_to(size)
+            for name, budget in QUERY_BUDGETS.items():
+                queries = self.run_queries(name)
+                counts[name][size] = len(queries)
+                with self.subTest(url=name, size=size):
+                    self.assertLessEqual(
+                        len(queries), budget,
+                        f"{name} ran {len(queries)} queries at size {size}, budget is {budget}:\n"
+                        + "\n".join(f"  {sql}" for sql in queries),
+                    )
+
+        for name in QUERY_BUDGETS:
+            with self.subTest(url=name):
+                self.assertEqual(
+                    len(set(counts[name].values())), 1,
+                    f"{name} query count grows with the data (size: queries {counts[name]}); "
+                    "something is querying per row",
+                )
+
+    def test_dashboard_sources(self):
+        # The live sources compute balances in SQL; none may fall back to current_balance per card
+        sources = ("worklist", "stored", "ledger")
+        counts = {source: {} for source in sources}
+        for size in DATA_SIZES:
+            self.portfolio.grow_to(size)
+            for source in sources:
+                with self.settings(DASHBOARD_BALANCE_SOURCE=source):
+                    counts[source][size] = len(self.run_queries("dashboard"))
+
+        for source in sources:
+            with self.subTest(source=source):
+                self.assertEqual(
+                    len(set(counts[source].values())), 1,
+                    f"dashboard ({source}) query count grows with the data: {counts[source]}",
+                )
+                self.assertLessEqual(max(counts[source].values()), QUERY_BUDGETS["dashboard"])
+
+
+class AsyncPartialBudgetTests(QueryBudgetTests):
+    """
+    The same budgets with ASYNC_PARTIALS on, so the htmx partials route to
+    async_views the way they do under the ASGI profile.
+    """
+
+    test_dashboard_sources = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # urls.py picks views or async_views at import time; cleanups run in reverse,
+        # so the URLconf is rebuilt after the setting is restored
+        cls.addClassCleanup(cls.reload_urls)
+        cls.enterClassContext(override_settings(ASYNC_PARTIALS=True))
+        cls.reload_urls()
+
+    @staticmethod
+    def reload_urls():
+        # The project URLconf holds the include()d resolver, which caches the app's patterns
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    def test_partials_are_async(self):
+        self.portfolio.grow_to(1)
+        for name in ("search-number", "search-clients", "hx-history-table", "load-provinces"):
+            with self.subTest(url=name):
+                self.assertEqual(resolve(self.url_for(name).split("?")[0]).func.__module__, async_views.__name__)
+
+
+class DashboardCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.other = get_user_model().objects.create_user(username="other", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        dashboard_cache_stats.reset()
+        self.portfolio = PortfolioBuilder(self.user)
+        self.portfolio.grow_to(1)
+        self.today = timezone.localdate()
+        self.day = self.today.strftime("%A")
+
+    def cards(self, user=None):
+        return dashboard_cards(user or self.user, self.today, self.day, False)
+
+    def test_second_render_is_cached(self):
+        html, cached = self.cards()
+        self.assertFalse(cached)
+        self.assertIn("9170000000", html)
+
+        self.assertEqual(self.cards(), (html, True))
+        self.assertEqual(dashboard_cache_stats.snapshot(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_ledger_change_invalidates(self):
+        before, _ = self.cards()
+        with self.captureOnCommitCallbacks(execute=True):
+            Invoice.objects.create(
+                number=self.portfolio.numbers[0], time=timezone.now(), added_load=Decimal("25"),
+                balance=Decimal("25"), reference_number="INV-NEW",
+            )
+
+        after, cached = self.cards()
+        self.assertFalse(cached)
+        self.assertNotEqual(after, before)
+        self.assertIn("65", after)
+
+    def test_version_bump_invalidates(self):
+        self.cards()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_dashboard([self.user.pk])
+        self.assertFalse(self.cards()[1])
+
+    def test_bump_waits_for_commit(self):
+        self.cards()
+        with self.captureOnCommitCallbacks(execute=False):
+            invalidate_dashboard([self.user.pk])
+        self.assertTrue(self.cards()[1])
+
+    def test_other_users_stay_cached(self):
+        self.cards()
+        self.cards(self.other)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_dashboard([self.user.pk])
+
+        self.assertFalse(self.cards()[1])
+        self.assertTrue(self.cards(self.other)[1])
+
+
+class HealthzTests(TestCase):
+
+    def setUp(self):
+        # No background probe thread racing the one under test
+        patcher = mock.patch.object(database_health, "start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(database_health.probe, close=False)
+
+    def test_failure_details_are_logged_not_returned(self):
+        error = OperationalError('could not connect to server "db.internal" as user "telco"')
+        with mock.patch.object(connection, "cursor", side_effect=error):
+            with self.assertLogs("clientside.health", "WARNING") as logs:
+                database_health.probe(close=False)
+
+        response = self.client.get(reverse("healthz"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"connected": False, "latency_ms": None})
+        self.assertIn("db.internal", logs.output[0])
+
+    def test_connected(self):
+        database_health.probe(close=False)
+        response = self.client.get(reverse("healthz"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"connected", "latency_ms"})
+
+
+class NumberSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="collector", password="secret")
+        portfolio = PortfolioBuilder(user)
+        portfolio.add_client(0)
+        client = portfolio.clients[0]
+        handler = Handler.objects.create(name="Handler", contact=912000000, client_handler=client)
+        for number in (9171230456, 9181111456, 9181110000, 9171234567):
+            Number.objects.create(
+                number=number, operator=portfolio.operator, client=client, handler=handler, collection_day="Monday",
+            )
+
+    def search(self, query):
+        return set(Number.objects.search_digits(query).values_list("number", flat=True))
+
+    def test_last_four_keeps_leading_zeros(self):
+        self.assertEqual(self.search("0456"), {9171230456})
+        self.assertEqual(self.search("0000"), {9181110000})
+        self.assertEqual(self.search("456"), {9171230456, 9181111456})
+
+    def test_prefix_ignores_national_and_country_prefixes(self):
+        self.assertEqual(self.search("0917123"), {9171230456, 9171234567})
+        self.assertEqual(self.search("+63 917 123 4567"), {9171234567})
+        self.assertEqual(self.search("639181110000"), {9181110000})
+        self.assertEqual(self.search("abc"), set())
+
+
+class NumberLoadMoreTests(TestCase):
+    """The search-number view's "load more" cursor walks the results without repeating or skipping."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+        cls.portfolio.add_client(0)
+        client = cls.portfolio.clients[0]
+        cls.handler = Handler.objects.create(name="Handler", contact=912000000, client_handler=client)
+        for number in [9171000000 + 7 * n for n in range(10)] + [9981000000]:
+            cls.add(number)
+
+        # Another collector's matching number stays out of every page
+        other = get_user_model().objects.create_user(username="other", password="secret")
+        PortfolioBuilder(other).grow_to(1)
+
+    @classmethod
+    def add(cls, number):
+        Number.objects.create(
+            number=number, operator=cls.portfolio.operator, client=cls.portfolio.clients[0],
+            handler=cls.handler, collection_day="Monday",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse("search-number"), {"q": "917", "size": 3, **params}, HTTP_HX_REQUEST="true")
+
+    def walk(self, between_pages=None):
+        response = self.get()
+        self.assertTemplateUsed(response, "number/partials/number_results.html")
+        pages = [[n.number for n in response.context["results"]]]
+        while response.context["next_cursor"]:
+            if between_pages:
+                between_pages(response.context["next_cursor"])
+                between_pages = None
+            response = self.get(after=response.context["next_cursor"])
+            self.assertTemplateUsed(response, "number/partials/number_result_rows.html")
+            pages.append([n.number for n in response.context["results"]])
+        return pages
+
+    def test_pages_cover_every_match_once(self):
+        pages = self.walk()
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual([n for page in pages for n in page], [9171000000 + 7 * n for n in range(10)])
+
+    def test_numbers_added_while_paging(self):
+        # Rows inserted behind the cursor don't shift later pages; rows ahead of it still show up
+        def insert(cursor):
+            self.add(cursor - 1)
+            self.add(cursor + 1)
+
+        pages = self.walk(between_pages=insert)
+        shown = [n for page in pages for n in page]
+
+        self.assertEqual(len(shown), len(set(shown)))
+        self.assertEqual(shown, sorted(shown))
+        self.assertNotIn(9171000013, shown)
+        self.assertIn(9171000015, shown)
+        self.assertEqual(len(shown), 11)
+
+
+class ClientSearchTests(TestCase):
+    """ClientQuerySet.search on the test database, i.e. the substring fallback used off PostgreSQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="collector", password="secret")
+        portfolio = PortfolioBuilder(user)
+        for n, (name, trade_name, handler) in enumerate([
+            ("Maria Santos", "Santos Sari-Sari", "Lito"),
+            ("Juan Cruz", "Maria's Bakery", "Nena"),
+            ("Pedro Reyes", "Corner Shop", "Maria Lopez"),
+            ("Ana Dela Maria", "Ana Store", "Lito"),
+            ("maria alvarez", "Alvarez Load", "Ben"),
+            ("Jose Rizal", "Rizal Mart", "Nena"),
+        ]):
+            portfolio.add_client(n)
+            client = portfolio.clients[-1]
+            Client.objects.filter(pk=client.pk).update(name=name, trade_name=trade_name)
+            Handler.objects.create(name=handler, contact=912000000 + n, client_handler=client)
+
+    def search(self, query):
+        return list(Client.objects.search(query).values_list("name", flat=True))
+
+    def test_the_test_database_takes_the_fallback(self):
+        self.assertNotEqual(connection.vendor, "postgresql")
+
+    def test_ranks_name_then_trade_name_then_anywhere(self):
+        self.assertEqual(self.search("maria"), [
+            "maria alvarez", "Maria Santos",    # name starts with it, then by name ignoring case
+            "Juan Cruz",                        # trade name starts with it
+            "Ana Dela Maria",                   # name contains it
+            "Pedro Reyes",                      # only the handler matches
+        ])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search("  MARIA   lopez "), ["Pedro Reyes"])
+        self.assertEqual(self.search("santos lito"), ["Maria Santos"])
+        # The rank compares the whole phrase, which no name starts with, so these sort by name
+        self.assertEqual(self.search("maria dagupan"), [
+            "Ana Dela Maria", "Juan Cruz", "maria alvarez", "Maria Santos", "Pedro Reyes",
+        ])
+        self.assertEqual(self.search("maria zamboanga"), [])
+
+    def test_blank_query_lists_everyone_by_name(self):
+        self.assertEqual(self.search(" "), [
+            "Ana Dela Maria", "Jose Rizal", "Juan Cruz", "maria alvarez", "Maria Santos", "Pedro Reyes",
+        ])
+
+
+class HistoryPagingTests(TestCase):
+    """Keyset pages of the history table (clientside.history) over rows that share a timestamp."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="collector", password="secret")
+        portfolio = PortfolioBuilder(user)
+        portfolio.add_client(0)
+        client = portfolio.clients[0]
+        handler = Handler.objects.create(name="Handler", contact=912000000, client_handler=client)
+        cls.number = Number.objects.create(
+            number=9171234567, operator=portfolio.operator, client=client, handler=handler, collection_day="Monday",
+        )
+
+        # Five rows at the same moment, so every page boundary below falls inside the tie
+        cls.moment = moment = timezone.make_aware(datetime(2026, 1, 5, 9, 0))
+        for reference, offset in (("INV-A1", 0), ("INV-A2", 0), ("INV-A3", 0), ("INV-B1", -1), ("INV-A4", 1)):
+            Invoice.objects.create(
+                number=cls.number, time=moment + timedelta(days=offset), added_load=Decimal("100"),
+                balance=Decimal("100"), reference_number=reference,
+            )
+        for reference, offset in (("PAY-A1", 0), ("PAY-B2", 0), ("PAY-A3", -2)):
+            Payment.objects.create(
+                number=cls.number, time=moment + timedelta(days=offset), paid_amount=Decimal("50"),
+                reference_number=reference,
+            )
+
+    def expected(self, descending=True, search=""):
+        rows = [
+            (row.time, "Invoice", row.id)
+            for row in Invoice.objects.filter(number=self.number, reference_number__contains=search)
+        ] + [
+            (row.time, "Payment", row.id)
+            for row in Payment.objects.filter(number=self.number, reference_number__contains=search)
+        ]
+        return [(row_type, row_id) for _, row_type, row_id in sorted(rows, reverse=descending)]
+
+    def page(self, **params):
+        query, finish = plan_history_page(self.number, params, page_size=3)
+        return finish(list(query))
+
+    def keys(self, context):
+        return [(row["type"], row["id"]) for row in context["rows"]]
+
+    def walk_forward(self, **params):
+        pages = [self.page(**params)]
+        while pages[-1]["page"]["has_next"]:
+            pages.append(self.page(**params, after=pages[-1]["page"]["after"]))
+        return pages
+
+    def test_forward_pages_cover_every_row_once(self):
+        for sort, descending in (("time_desc", True), ("time_asc", False)):
+            with self.subTest(sort=sort):
+                pages = self.walk_forward(sort=sort)
+
+                self.assertEqual([len(page["rows"]) for page in pages], [3, 3, 2])
+                self.assertEqual([key for page in pages for key in self.keys(page)], self.expected(descending))
+                self.assertFalse(pages[0]["page"]["has_previous"])
+                self.assertTrue(pages[1]["page"]["has_previous"])
+                self.assertFalse(pages[-1]["page"]["has_next"])
+
+    def test_backward_pages_retrace_the_forward_ones(self):
+        for sort in ("time_desc", "time_asc"):
+            with self.subTest(sort=sort):
+                forward = self.walk_forward(sort=sort)
+
+                backward = [forward[-1]]
+                while backward[-1]["page"]["has_previous"]:
+                    backward.append(self.page(sort=sort, before=backward[-1]["page"]["before"]))
+
+                self.assertEqual([self.keys(page) for page in reversed(backward)], [self.keys(page) for page in forward])
+                self.assertTrue(all(page["page"]["has_next"] for page in backward[1:]))
+
+    def test_pages_with_a_search(self):
+        pages = self.walk_forward(search="A")
+        self.assertEqual([key for page in pages for key in self.keys(page)], self.expected(search="A"))
+
+        # A date search matches exactly the tied rows, which still split cleanly over two pages
+        pages = self.walk_forward(search="2026-01-05")
+        self.assertEqual([len(page["rows"]) for page in pages], [3, 2])
+        self.assertEqual(
+            {key for page in pages for key in self.keys(page)},
+            {("Invoice", pk) for pk in Invoice.objects.filter(time=self.moment).values_list("id", flat=True)}
+            | {("Payment", pk) for pk in Payment.objects.filter(time=self.moment).values_list("id", flat=True)},
+        )
+
+    def test_unreadable_cursor_starts_at_the_first_page(self):
+        self.assertEqual(self.keys(self.page(after="not-a-cursor")), self.keys(self.page()))
+        self.assertFalse(self.page(after="not-a-cursor")["page"]["has_previous"])
+
+
+class ImportNumbersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="collector", password="secret")
+        portfolio = PortfolioBuilder(user)
+        portfolio.add_client(0)
+        cls.client_ = portfolio.clients[0]
+        cls.lito = Handler.objects.create(name="Lito", contact=912000000, client_handler=cls.client_)
+        cls.nena = Handler.objects.create(name="Nena", contact=912000001, client_handler=cls.client_)
+        NumberOperatorIdentifier.objects.create(number=917, operator=portfolio.operator)
+        cls.globe = portfolio.operator
+        Number.objects.create(
+            number=9179999999, operator=portfolio.operator, client=cls.client_, handler=cls.lito, collection_day="Monday",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def run_import(self, batch_size):
+        rows = [
+            {"number": "09171234567", "handler": " lito ", "collection_day": "monday"},
+            {"number": "+639171234568", "handler": str(self.nena.id), "collection_day": "Tuesday", "sim_status": "inactive"},
+            {"number": "917-abc", "handler": "Lito", "collection_day": "Monday"},
+            {"number": "9171234567", "handler": "Lito", "collection_day": "Monday"},
+            {"number": "9179999999", "handler": "Lito", "collection_day": "Monday"},
+            {"number": "9171111111", "handler": "Nobody", "collection_day": "Monday"},
+            {"number": "9171111112", "handler": "Lito", "collection_day": "Someday"},
+            {"number": "9171111113", "handler": "Lito", "collection_day": "Monday", "sim_status": "Lost"},
+            {"number": "9981234567", "handler": "Lito", "collection_day": "Monday"},
+            {"number": "9171111114", "handler": "Nena", "collection_day": "Friday"},
+        ]
+        return import_numbers(self.client_, enumerate(rows, start=2), batch_size=batch_size)
+
+    def assertImported(self, report):
+        self.assertEqual(report.created, 3)
+        # Row checks run before the per-batch database checks, so errors come out of row order
+        self.assertEqual(sorted((row, message) for row, _, message in report.errors), [
+            (4, "Number must contain digits only."),
+            (5, "Duplicate number in this file."),
+            (6, "Number is already registered."),
+            (7, "Unknown handler 'Nobody'."),
+            (8, "Invalid collection day 'Someday'."),
+            (9, "Invalid SIM status 'Lost'."),
+            (10, "No operator found for this number prefix."),
+        ])
+
+        created = Number.objects.filter(client=self.client_).exclude(number=9179999999).order_by("number")
+        self.assertEqual(
+            [(n.number, n.handler_id, n.collection_day, n.sim_status, n.operator_id) for n in created],
+            [
+                (9171111114, self.nena.id, "Friday", "Active", self.globe.id),
+                (9171234567, self.lito.id, "Monday", "Active", self.globe.id),
+                (9171234568, self.nena.id, "Tuesday", "Inactive", self.globe.id),
+            ],
+        )
+        self.assertEqual([n.last_four for n in created], ["1114", "4567", "4568"])
+
+    def test_reports_each_bad_row(self):
+        self.assertImported(self.run_import(batch_size=100))
+
+    def test_checks_span_batches(self):
+        # The in-file duplicate and the registered number land in later batches than their twins
+        self.assertImported(self.run_import(batch_size=2))
+
+
+class ImportLedgerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+        cls.portfolio.grow_to(1)
+
+    def test_rejects_amounts_the_columns_cannot_hold(self):
+        number = self.portfolio.numbers[0]
+        amounts = ["NaN", "Infinity", "-inf", "1e20", "12345678901", "10.005", "1,250.50"]
+        rows = [
+            (n, {"number": str(number.number), "time": "2026-01-05", "amount": amount, "reference": f"P-{n}"})
+            for n, amount in enumerate(amounts, start=2)
+        ]
+
+        report = import_ledger(rows, entry_type="payment")
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([error[0] for error in report.errors], [2, 3, 4, 5, 6, 7])
+        self.assertEqual(Payment.objects.get(reference_number="P-8").paid_amount, Decimal("1250.50"))
+        number.refresh_from_db()
+        self.assertEqual(number.running_balance, Decimal("100") - Decimal("60") - Decimal("1250.50"))
+
+
+class SeedToCoreTests(TestCase):
+    """seed_to_core copies phil_loc into the clientside location models, matching on (name, parent)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from phil_loc import models as phil
+
+        region_1 = phil.Region.objects.create(reg_code=1, name="Region I")
+        ncr = phil.Region.objects.create(reg_code=13, name="NCR")
+        ilocos = phil.Province.objects.create(prov_code=128, reg_code=1, name="Ilocos Norte", region=region_1)
+        pangasinan = phil.Province.objects.create(prov_code=155, reg_code=1, name="Pangasinan", region=region_1)
+        phil.Province.objects.create(prov_code=1339, reg_code=13, name="Manila", region=ncr)
+
+        laoag = phil.Municipality.objects.create(city_mun_code=12801, prov_code=128, name="Laoag", province=ilocos)
+        dagupan = phil.Municipality.objects.create(city_mun_code=15518, prov_code=155, name="Dagupan", province=pangasinan)
+        # Same name under two provinces: two rows, not one
+        phil.Municipality.objects.create(city_mun_code=12802, prov_code=128, name="San Nicolas", province=ilocos)
+        phil.Municipality.objects.create(city_mun_code=15530, prov_code=155, name="San Nicolas", province=pangasinan)
+        # prov_code points nowhere, so it and its barangay are skipped
+        lost = phil.Municipality.objects.create(city_mun_code=99901, prov_code=999, name="Lost", province=ilocos)
+
+        phil.Barangay.objects.create(brgy_code=1280101, city_mun_code=12801, name="Poblacion", municipality=laoag)
+        phil.Barangay.objects.create(brgy_code=1551801, city_mun_code=15518, name="Poblacion", municipality=dagupan)
+        phil.Barangay.objects.create(brgy_code=1551802, city_mun_code=15518, name="Bonuan", municipality=dagupan)
+        phil.Barangay.objects.create(brgy_code=9990101, city_mun_code=99901, name="Nowhere", municipality=lost)
+
+    def seed(self, *args):
+        out = io.StringIO()
+        with mock.patch("clientside.management.commands.seed_to_core.invalidate_location_cache") as invalidate:
+            call_command("seed_to_core", *args, stdout=out)
+        return out.getvalue(), invalidate.called
+
+    def snapshot(self):
+        return {
+            "regions": set(Region.objects.values_list("id", "name")),
+            "provinces": set(Province.objects.values_list("id", "name", "region__name")),
+            "municipalities": set(Municipality.objects.values_list("id", "name", "province__name")),
+            "barangays": set(Barangay.objects.values_list("id", "name", "municipality__name")),
+        }
+
+    def test_rerun_creates_nothing(self):
+        # An existing row is matched, not duplicated
+        Region.objects.create(name="Region I")
+
+        output, invalidated = self.seed("--batch-size", "1")
+        first = self.snapshot()
+
+        self.assertTrue(invalidated)
+        self.assertIn("Regions: 2 in phil_loc, 1 already present, 1 created", output)
+        self.assertIn("Barangays: 4 in phil_loc, 0 already present, 3 created, 1 skipped without parent", output)
+        self.assertEqual({name for _, name in first["regions"]}, {"Region I", "NCR"})
+        self.assertEqual(
+            sorted((name, province) for _, name, province in first["municipalities"]),
+            [("Dagupan", "Pangasinan"), ("Laoag", "Ilocos Norte"), ("San Nicolas", "Ilocos Norte"),
+             ("San Nicolas", "Pangasinan")],
+        )
+        self.assertEqual(
+            sorted((name, municipality) for _, name, municipality in first["barangays"]),
+            [("Bonuan", "Dagupan"), ("Poblacion", "Dagupan"), ("Poblacion", "Laoag")],
+        )
+
+        output, _ = self.seed()
+
+        self.assertEqual(self.snapshot(), first)
+        self.assertIn("Municipalities: 5 in phil_loc, 4 already present, 0 created, 1 skipped without parent", output)
+
+    def test_dry_run_writes_nothing(self):
+        with CaptureQueriesContext(connection) as captured:
+            output, invalidated = self.seed("--dry-run")
+
+        self.assertFalse(invalidated)
+        self.assertEqual(self.snapshot(), {"regions": set(), "provinces": set(), "municipalities": set(), "barangays": set()})
+        self.assertFalse([q["sql"] for q in captured.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))])
+        # Levels below a would-be-created parent are still counted as new
+        self.assertIn("Provinces: 3 in phil_loc, 0 already present, 3 would create", output)
+        self.assertIn("Barangays: 4 in phil_loc, 0 already present, 3 would create, 1 skipped without parent", output)
+
+
+class StatementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+        cls.portfolio.grow_to(1)
+        cls.number = cls.portfolio.numbers[0]
+        now = timezone.now()
+        Payment.objects.bulk_create([
+            Payment(number=cls.number, time=now - timedelta(minutes=n), paid_amount=Decimal("1"))
+            for n in range(STATEMENT_ROWS_PER_TABLE * 5)
+        ])
+
+    def render(self, start, end):
+        output = io.BytesIO()
+        render_statement(self.number, start, end, output)
+        return output.getvalue()
+
+    def test_tables_are_pulled_as_pages_are_laid_out(self):
+        pulled = []
+
+        def tables():
+            for n in range(6):
+                pulled.append(n)
+                yield statement_table([("Payment", ["", "Payment", "1", ""])] * STATEMENT_ROWS_PER_TABLE)
+
+        doc = StatementDocTemplate(io.BytesIO(), more=tables())
+        laid_out = []
+        doc.afterFlowable = lambda flowable: isinstance(flowable, Table) and laid_out.append(len(pulled))
+        doc.build([Spacer(1, 12)])
+
+        self.assertEqual(len(pulled), 6)
+        # Whenever a table was placed, at most the one queued behind it had been pulled too
+        for placed, pulled_by_then in enumerate(laid_out, start=1):
+            self.assertLessEqual(pulled_by_then, placed + 1)
+
+    def test_renders_every_page_and_empty_ranges(self):
+        now = timezone.now()
+        full = self.render(now - timedelta(days=30), now + timedelta(days=1))
+        empty = self.render(now + timedelta(days=1), now + timedelta(days=2))
+
+        self.assertTrue(full.startswith(b"%PDF"))
+        self.assertGreater(full.count(b"/Type /Page\n"), empty.count(b"/Type /Page\n"))
+        self.assertEqual(empty.count(b"/Type /Page\n"), 1)
+
+
+class PrintStatementsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+        cls.portfolio.grow_to(2)
+
+    def test_one_failing_number_does_not_abort_the_batch(self):
+        broken = self.portfolio.numbers[1]
+
+        def render(number, *args, **kwargs):
+            if number.pk == broken.pk:
+                raise ValueError("bad row")
+            return render_statement(number, *args, **kwargs)
+
+        out, output_dir = io.StringIO(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        with mock.patch("clientside.management.commands.print_statements.render_statement", render):
+            with self.assertRaisesMessage(CommandError, "1 of 4 statements failed"):
+                call_command("print_statements", output_dir=output_dir, workers=1, stdout=out)
+
+        self.assertEqual(len(list(Path(output_dir).glob("*.pdf"))), 3)
+        self.assertIn(f"{broken.number}  failed: ValueError('bad row')", out.getvalue())
+
+
+class OperatorPrefixTests(TestCase):
+
+    def test_new_prefixes_reach_other_processes(self):
+        globe = Operator.objects.create(name="Globe")
+        NumberOperatorIdentifier.objects.create(number=917, operator=globe)
+        cache.clear()
+
+        # Another worker's resolver, loaded before the new prefix exists
+        other = OperatorPrefixResolver()
+        self.assertEqual(other.resolve("09171234567"), globe.id)
+        self.assertIsNone(other.resolve("09981234567"))
+
+        smart = Operator.objects.create(name="Smart")
+        with self.captureOnCommitCallbacks(execute=True):
+            NumberOperatorIdentifier.objects.create(number=998, operator=smart)
+
+        self.assertEqual(other.resolve("09981234567"), smart.id)
+
+
+class LocationVersionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="collector", password="secret")
+        cls.portfolio = PortfolioBuilder(cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def etag(self):
+        return self.client.get(reverse("load-provinces"), {"region": self.portfolio.region.id})["ETag"]
+
+    def test_etag_is_derived_from_the_data(self):
+        # A worker that never saw the cached version computes the same ETag
+        etag = self.etag()
+        cache.clear()
+        self.assertEqual(self.etag(), etag)
+
+        Province.objects.create(region=self.portfolio.region, name="La Union")
+        invalidate_location_cache()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_index_picks_up_rows_added_without_a_reseed(self):
+        self.assertTrue(location_index.exists("provinces", self.portfolio.province.id))
+        province = Province.objects.create(region=self.portfolio.region, name="La Union")
+        self.assertTrue(location_index.exists("provinces", province.id))
+        self.assertEqual(location_index.parent("provinces", province.id), self.portfolio.region.id)
+        self.assertFalse(location_index.exists("provinces", province.id + 1))
+
+    def test_static_handler_serves_the_gzipped_tree(self):
+        payload = b'{"regions":[]}'
+        with tempfile.TemporaryDirectory() as static_dir:
+            Path(static_dir, "data").mkdir()
+            Path(static_dir, "data", "locations.abc.json").write_bytes(payload)
+            Path(static_dir, "data", "locations.abc.json.gz").write_bytes(gzip.compress(payload))
+
+            with self.settings(STATICFILES_DIRS=[static_dir]):
+                finders.get_finder.cache_clear()
+                self.addCleanup(finders.get_finder.cache_clear)
+                handler = PrecompressedStaticFilesHandler(get_wsgi_application())
+                factory = RequestFactory()
+
+                response = handler.serve(factory.get("/static/data/locations.abc.json", HTTP_ACCEPT_ENCODING="gzip, br"))
+                self.assertEqual(response["Content-Encoding"], "gzip")
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), payload)
+                response.close()
+
+                response = handler.serve(factory.get("/static/data/locations.abc.json"))
+                self.assertNotIn("Content-Encoding", response)
+                self.assertIn("Accept-Encoding", response["Vary"])
+                self.assertEqual(b"".join(response.streaming_content), payload)
+                response.close()
+
+
+class RequestTimingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="staff", password="secret", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        request_stats.reset()
+
+    def test_off_by_default(self):
+        response = self.client.get(reverse("clients"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_server_timing_counts_every_query(self):
+        with CaptureQueriesContext(connection) as captured:
+            with self.assertLogs("clientside.timing") as logs:
+                response = self.client.get(reverse("clients"))
+
+        self.assertIn(f'desc="{len(captured)} queries"', response["Server-Timing"])
+        for metric in ("sql;", "view;", "tpl;", "total;"):
+            self.assertIn(metric, response["Server-Timing"])
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["route"], "clients")
+        self.assertEqual(line["sql_count"], len(captured))
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_stats_page_is_staff_only(self):
+        with self.assertLogs("clientside.timing"):
+            self.client.get(reverse("clients"))
+            response = self.client.get(reverse("request-stats"))
+            self.assertContains(response, "<code>clients</code>")
+
+            self.user.is_staff = False
+            self.user.save()
+            response = self.client.get(reverse("request-stats"))
+            self.assertEqual(response.status_code, 302)
+
+
+class QueryInspectorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="staff", password="secret", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.portfolio = PortfolioBuilder(self.user)
+        self.portfolio.grow_to(2)
+        query_reports.clear()
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM "t" WHERE "a" = %s AND "b" IN (%s, %s, %s) AND "c" = \'x\'  LIMIT 21'),
+            'SELECT * FROM "t" WHERE "a" = ? AND "b" IN (...) AND "c" = ? LIMIT ?',
+        )
+
+    @override_settings(QUERY_INSPECTOR=True, QUERY_INSPECTOR_REPEAT=3)
+    def test_flags_repeated_shapes_at_their_call_site(self):
+        install_hooks()
+        timing, token = start_request()
+        timing.recorder = QueryRecorder(timing)
+        try:
+            # Number.__str__ walks operator, client and client.user_client per row
+            [str(number) for number in Number.objects.all()]
+        finally:
+            end_request(token)
+
+        repeated = [g for g in timing.recorder.groups() if g["repeated"]]
+        self.assertEqual(len(repeated), 3)
+        for group in repeated:
+            self.assertEqual(group["count"], 4)
+            self.assertIn("in __str__", group["stack"][0])
+
+    @override_settings(QUERY_INSPECTOR=True, QUERY_INSPECTOR_SLOW_MS=0)
+    def test_reports_requests_with_plans(self):
+        url = reverse("client-detail", args=[self.portfolio.clients[0].id])
+        with self.assertLogs("clientside.queries", "WARNING") as logs:
+            self.client.get(url)
+
+            report = query_reports.all()[0]
+            self.assertEqual(report["route"], "client-detail")
+            self.assertEqual(report["repeated"], [])
+            self.assertTrue(any(slow["plan"] for slow in report["slow"]))
+            self.assertIn("client-detail", logs.output[0])
+
+            response = self.client.get(reverse("query-reports"))
+            self.assertContains(response, url)
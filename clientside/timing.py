@@ -0,0 +1,183 @@
+import contextvars
+import threading
+import time
+from collections import deque
+
+
+# Per-request timing, collected by clientside.middleware when REQUEST_TIMING (or
+# QUERY_INSPECTOR, see clientside.queries) is on.
+# The middleware opens a RequestTiming for each request; the SQL and template hooks
+# add to whichever one is current in the context. Finished requests are folded into
+# request_stats, which the staff stats page reads.
+
+TIMING_SAMPLES = 200           # recent durations kept per URL name for the percentiles
+
+_current = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.view_ms = 0.0
+        self.template_ms = 0.0
+        self.total_ms = 0.0
+        self.recorder = None      # clientside.queries.QueryRecorder under QUERY_INSPECTOR
+        self.paused = False
+
+    def add_query(self, elapsed_ms):
+        self.sql_count += 1
+        self.sql_ms += elapsed_ms
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        return ", ".join([
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} queries"',
+            f'view;dur={self.view_ms:.1f};desc="view + templates"',
+            f'tpl;dur={self.template_ms:.1f};desc="templates"',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+
+def start_request():
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_timing():
+    return _current.get()
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Times each statement against whichever request is current on this context."""
+    timing = _current.get()
+    if timing is None or timing.paused:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timing.add_query(elapsed_ms)
+        if timing.recorder is not None:
+            timing.recorder.record(sql, params, many, elapsed_ms, context["connection"])
+
+
+def add_execute_wrapper(sender, connection, **kwargs):
+    # connection_created receiver: every connection, in every thread, gets the wrapper once.
+    # The context var (not the connection) decides which request a statement belongs to,
+    # so queries a sync view runs in an ASGI worker thread still land on their request.
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+_hooks_installed = False
+
+
+def install_hooks():
+    """
+    Hook SQL execution and template rendering; called once, and only when
+    REQUEST_TIMING or QUERY_INSPECTOR is on.
+
+    Templates are timed at the Django backend's Template.render, which render() and
+    render_to_string() go through once per page or partial; {% include %} renders
+    inside it and is not counted twice.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+    from django.template.backends.django import Template
+
+    connection_created.connect(add_execute_wrapper, dispatch_uid="clientside.timing")
+    for connection in connections.all(initialized_only=True):
+        add_execute_wrapper(None, connection)
+
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return original(self, context, request)
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            timing.template_ms += (time.perf_counter() - started) * 1000
+
+    Template.render = render
+    _hooks_installed = True
+
+
+class RequestStats:
+    """Per-URL-name aggregates for this process; each gunicorn worker keeps its own."""
+
+    def __init__(self, samples=TIMING_SAMPLES):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.since = time.time()
+
+    def record(self, route, timing):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "sql_count": 0,
+                    "sql_ms": 0.0,
+                    "view_ms": 0.0,
+                    "template_ms": 0.0,
+                    "recent": deque(maxlen=self.samples),
+                }
+            entry["requests"] += 1
+            entry["total_ms"] += timing.total_ms
+            entry["max_ms"] = max(entry["max_ms"], timing.total_ms)
+            entry["sql_count"] += timing.sql_count
+            entry["sql_ms"] += timing.sql_ms
+            entry["view_ms"] += timing.view_ms
+            entry["template_ms"] += timing.template_ms
+            entry["recent"].append(timing.total_ms)
+
+    def snapshot(self):
+        """One row per URL name, slowest average first."""
+        with self._lock:
+            routes = {route: dict(entry, recent=sorted(entry["recent"])) for route, entry in self._routes.items()}
+
+        rows = []
+        for route, entry in routes.items():
+            n = entry["requests"]
+            recent = entry["recent"]
+            rows.append({
+                "route": route,
+                "requests": n,
+                "avg_ms": entry["total_ms"] / n,
+                "p50_ms": recent[len(recent) // 2],
+                "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+                "max_ms": entry["max_ms"],
+                "avg_queries": entry["sql_count"] / n,
+                "avg_sql_ms": entry["sql_ms"] / n,
+                "avg_view_ms": entry["view_ms"] / n,
+                "avg_template_ms": entry["template_ms"] / n,
+            })
+        rows.sort(key=lambda row: row["avg_ms"], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self.since = time.time()
+
+
+request_stats = RequestStats()
@@ -1,54 +1,59 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views, views
 from .views import (
     index,
+    healthz,
     my_login,
     dashboard,
     user_logout,
     create_client,
-    load_barangays,
-    load_municipalities,
-    load_provinces,
     list_client,
-    search_clients,
     client_detail,
     add_handler,
     list_handler,
     edit_handler,
 
     add_number,
+    import_numbers,
     number_search,
     number_detail,
     edit_number,
 
 
     number_page,
-    search_number_page,
 
 
     payment_invoice_page,
     add_invoice,
     add_payment,
-    hx_history_table,
 
     print_number_history,
+
+    request_stats_page,
+    query_reports_page,
     )
 
+# htmx partials: async views under the ASGI profile (ASYNC_PARTIALS), sync otherwise
+partials = async_views if settings.ASYNC_PARTIALS else views
+
 urlpatterns = [
     # Load Dropdown
 
-    path("load-provinces/", load_provinces, name="load-provinces"),
-    path("load-barangays/", load_barangays, name="load-barangays"),
-    path("load-municipalities/", load_municipalities, name="load-municipalities"),
+    path("load-provinces/", partials.load_provinces, name="load-provinces"),
+    path("load-barangays/", partials.load_barangays, name="load-barangays"),
+    path("load-municipalities/", partials.load_municipalities, name="load-municipalities"),
 
 
     path('', index, name='index'),
+    path('healthz/', healthz, name='healthz'),
     path('login/', my_login, name='login'),
     path('dashboard/',dashboard, name='dashboard'),
     path('user-logout/', user_logout, name="user-logout"),
 
 
     path('clients/', list_client, name="clients"),
-    path("clients/search/", search_clients, name="search-clients"),
+    path("clients/search/", partials.search_clients, name="search-clients"),
     path('clients/create-client', create_client, name='create-client'),
     path("clients/<uuid:client_id>/", client_detail, name="client-detail"),
 
@@ -60,6 +65,7 @@ urlpatterns = [
 
 
     path("clients/<uuid:client_id>/add-number/", add_number, name="add-number"),
+    path("clients/<uuid:client_id>/import-numbers/", import_numbers, name="import-numbers"),
     path("clients/<uuid:client_id>/numbers/search/", number_search, name="number-search"),
 
     path("numbers/", number_page, name="number-page"),
@@ -72,11 +78,14 @@ urlpatterns = [
 
     path("numbers/<uuid:number_id>/edit/", edit_number, name="edit-number"),
 
-    path("numbers/search/", search_number_page, name="search-number"),
+    path("numbers/search/", partials.search_number_page, name="search-number"),
 
 
     path("payments/", payment_invoice_page, name='payment-page' ),
-    path("numbers/<uuid:number_id>/history/", hx_history_table, name="hx-history-table"),
+    path("numbers/<uuid:number_id>/history/", partials.hx_history_table, name="hx-history-table"),
+
+    path("stats/requests/", request_stats_page, name="request-stats"),
+    path("stats/queries/", query_reports_page, name="query-reports"),
 
 
 
@@ -1,20 +1,21 @@
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import auth
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.core.paginator import Paginator
-from django.db.utils import OperationalError
-from django.db import connection
 from django.core.cache import cache
-from django.db.models.functions import Lower
-from django.contrib.staticfiles import finders
+from django.conf import settings
 
 
-from django.db.models import Prefetch, Count, Sum
+from django.db.models import Sum
 from django.db.models.functions import Coalesce
 
 
@@ -26,22 +27,25 @@ from django.utils.timezone import timedelta
 
 # Printing:
 
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from datetime import datetime
+from .statements import render_statement
+from .operators import prefix_resolver
+from .importers import read_rows, import_numbers as import_number_rows
+from .locations import (
+    LOCATION_MAX_AGE, location_conditions, location_fragment, location_parent_id, location_tree_url,
+)
+from .health import database_health
+from .dashboard import dashboard_cards, dashboard_cache_stats
+from .history import plan_history_page
+from .queries import format_report, query_reports
+from .timing import request_stats
 
 
 from .models import (
     Region,
-    Province,
-    Municipality,
-    Barangay,
 
     Client,
     Handler,
-    NumberOperatorIdentifier,
     Operator,
     Number,
     Payment,
@@ -53,6 +57,7 @@ from .forms import (
     CreateClientForm,
     HandlerForm,
     AddNumberForm,
+    NumberImportForm,
     InvoiceForm,
     PaymentForm,
     )
@@ -61,26 +66,25 @@ from .forms import (
 
 MAX_ATTEMPTS = 5               # allowed failed attempts
 LOCKOUT_TIME = 100             # seconds (5 minutes)
+CLIENTS_PER_PAGE = 24          # client cards per page
 
 
 def index(request):
-    # Default assumption
-    db_connected = True
-    
-    try:
-        # Attempt a simple operation to verify the connection is active
-        # 'connection.ensure_connection()' attempts to make a new connection if none exists.
-        connection.ensure_connection()
-    except OperationalError:
-        # This exception fires if the database server can't be reached
-        db_connected = False
-
-    # Pass the connection status to the template context
-    context = {
-        'db_connected': db_connected
-    }
-    
-    return render(request, "index.html", context)
+    # db_connected comes from the health context processor
+    return render(request, "index.html")
+
+
+def healthz(request):
+    # Lightweight probe for load balancers: re-checks only when the cached result is stale
+    status = database_health.status()
+    if status["stale"]:
+        status = database_health.probe(close=False)
+
+    # Public and unauthenticated: failure details stay in the clientside.health log
+    return JsonResponse({
+        "connected": status["connected"],
+        "latency_ms": status["latency_ms"],
+    }, status=200 if status["connected"] else 503)
 
 
 def get_client_ip(request):
@@ -139,12 +143,6 @@ def my_login(request):
 def dashboard(request):
     user = request.user
 
-    # A user may have multiple clients
-    client_list = user.clients.all()
-
-    if not client_list.exists():
-        return render(request, "client/dashboard.html", {"numbers": []})
-
     # Use Django-aware local date (respects Asia/Manila timezone)
     today = timezone.localdate()
 
@@ -165,19 +163,11 @@ def dashboard(request):
     # Show all toggle
     show_all = request.GET.get("show") == "all"
 
-    # Query numbers
-    base_qs = Number.objects.filter(
-        client__in=client_list,
-        sim_status="Active",
-        collection_day=selected_day
-    )
-
-    # Filter positive balance only unless show_all is ON
-    if not show_all:
-        base_qs = [n for n in base_qs if n.current_balance > 0]
+    # Card list comes from the per-user fragment cache (clientside.dashboard)
+    cards, cached = dashboard_cards(user, today, selected_day, show_all)
 
     context = {
-        "numbers": base_qs,
+        "cards": cards,
         "today": today_name,
         "prev_day": prev_day_name,
         "next_day": next_day_name,
@@ -185,7 +175,9 @@ def dashboard(request):
         "show_all": show_all,
     }
 
-    return render(request, "client/dashboard.html", context)
+    response = render(request, "client/dashboard.html", context)
+    response["X-Dashboard-Cache"] = "hit" if cached else "miss"
+    return response
 
 
 def user_logout(request):
@@ -195,28 +187,27 @@ def user_logout(request):
     return redirect('login')
 
 
+# Location cascade: static reference data, cached per parent id and revalidated via ETag
+
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@condition(**location_conditions("provinces", "region"))
 def load_provinces(request):
-    region_id = request.GET.get("region")
-    provinces = Province.objects.filter(region_id=region_id).order_by("-id")
-    return render(request, "client/partials/province_dropdown.html", {
-        "provinces": provinces
-    })
+    region_id = location_parent_id(request.GET.get("region"))
+    return HttpResponse(location_fragment("provinces", region_id))
 
 
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@condition(**location_conditions("municipalities", "province"))
 def load_municipalities(request):
-    province_id = request.GET.get("province")
-    municipalities = Municipality.objects.filter(province_id=province_id).order_by('-id')
-    return render(request, "client/partials/municipality_dropdown.html", {
-        "municipalities": municipalities
-    })
+    province_id = location_parent_id(request.GET.get("province"))
+    return HttpResponse(location_fragment("municipalities", province_id))
 
 
+@cache_control(public=True, max_age=LOCATION_MAX_AGE)
+@condition(**location_conditions("barangays", "municipality"))
 def load_barangays(request):
-    municipality_id = request.GET.get("municipality")
-    barangays = Barangay.objects.filter(municipality_id=municipality_id).order_by('name')
-    return render(request, "client/partials/barangay_dropdown.html", {
-        "barangays": barangays
-    })
+    municipality_id = location_parent_id(request.GET.get("municipality"))
+    return HttpResponse(location_fragment("barangays", municipality_id))
 
 
 @login_required(login_url='login')
@@ -234,66 +225,54 @@ def create_client(request):
     return render(request, "client/create_client.html", {
         "form": form,
         "regions": regions,
+        "location_tree_url": location_tree_url(),
     })
 
 
+def client_portfolio_query(user, params):
+    search = params.get("search", "").strip()
+
+    clients = Client.objects.filter(
+        user_client=user
+    ).search(search).with_portfolio_totals()
+    return clients, search
+
+
+def client_portfolio_page(request):
+    # Shared by list_client and search_clients: totals are grouped in SQL, one page at a time
+    clients, search = client_portfolio_query(request.user, request.GET)
+
+    paginator = Paginator(clients, CLIENTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get("page", 1))
+
+    return {
+        "clients": page_obj.object_list,
+        "page_obj": page_obj,
+        "search": search,
+    }
+
+
 #list all Client
 @login_required(login_url='login')
 def search_clients(request):
-    query = request.GET.get("search", "")
-
-    clients = Client.objects.filter(
-        user_client=request.user,
-        name__icontains=query
-    ).annotate(
-        client_numbers_count=Count('number')
-    ).prefetch_related(
-        Prefetch(
-            'number_set',
-            queryset=Number.objects.prefetch_related('invoices', 'payments')
-        )
-    ).order_by("name")
-
-    # Calculate total_balance for each client (same as list_client view)
-    for client in clients:
-        client.client_total_balance = 0
-        for number in client.number_set.all():
-            client.client_total_balance += float(number.current_balance)
-
-    return render(request, "client/partials/client_list.html", {
-        "clients": clients
-    })
+    return render(request, "client/partials/client_list.html", client_portfolio_page(request))
 
 
 @login_required(login_url='login')
 def list_client(request):
-    clients = Client.objects.filter(user_client=request.user)\
-        .annotate(lower_name=Lower('name'))\
-        .annotate(client_numbers_count=Count('number'))\
-        .prefetch_related(
-            Prefetch(
-                'number_set',
-                queryset=Number.objects.prefetch_related('invoices', 'payments')
-            )
-        )\
-        .order_by('lower_name')
-
-    # Calculate total_balance for each client
-    for client in clients:
-        client.client_total_balance = 0  # Changed name
-        for number in client.number_set.all():
-            client.client_total_balance += float(number.current_balance)
-
-    return render(request, "client/list-client.html", {
-        "clients": clients
-    })
+    return render(request, "client/list-client.html", client_portfolio_page(request))
 
 
 @login_required(login_url='login')
 def client_detail(request, client_id):
-    client = Client.objects.get(id=client_id, user_client=request.user)
-    handlers = Handler.objects.filter(client_handler=client)
-    numbers = Number.objects.filter(client=client).select_related("operator")
+    client = Client.objects.select_related(
+        "primary_address__region",
+        "primary_address__province",
+        "primary_address__municipality",
+        "primary_address__barangay",
+    ).get(id=client_id, user_client=request.user)
+    handlers = Handler.objects.filter(client_handler=client).select_related("client_handler")
+    numbers = Number.objects.filter(client=client).select_related("operator", "handler")
     operators = Operator.objects.all()
 
 
@@ -366,32 +345,17 @@ def add_number(request, client_id):
         form = AddNumberForm(request.POST, client=client)
 
         if form.is_valid():
-            number_value = str(form.cleaned_data["number"])  # Convert to string
-            normalized = number_value.lstrip("0")  # Remove leading zero (if any)
-
-            # Try longest prefixes first (4-digit, then 3-digit)
-            possible_prefixes = [
-                normalized[:4],  # 4-digit prefix
-                normalized[:3],  # 3-digit prefix
-            ]
-
-            number_identifier = None
-
-            for prefix in possible_prefixes:
-                try:
-                    number_identifier = NumberOperatorIdentifier.objects.get(number=prefix)
-                    break
-                except NumberOperatorIdentifier.DoesNotExist:
-                    continue
+            # Longest matching prefix from the in-memory operator table
+            operator_id = prefix_resolver.resolve(form.cleaned_data["number"])
 
             # If no matching prefix found
-            if not number_identifier:
+            if operator_id is None:
                 form.add_error('number', "No operator found for this number prefix.")
                 return render(request, 'number/add_number.html', {"form": form, "client": client})
 
             # Create Number entry
             new_number = form.save(commit=False)
-            new_number.operator = number_identifier.operator
+            new_number.operator_id = operator_id
             new_number.client = client
             new_number.save()
 
@@ -404,16 +368,42 @@ def add_number(request, client_id):
 
 
 
+@login_required(login_url='login')
+def import_numbers(request, client_id):
+    client = get_object_or_404(Client, id=client_id, user_client=request.user)
+    report = None
+
+    if request.method == "POST":
+        form = NumberImportForm(request.POST, request.FILES)
+
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                report = import_number_rows(client, read_rows(upload, upload.name))
+            except ValueError as e:
+                form.add_error("file", str(e))
+            else:
+                messages.success(request, f"{report.created} numbers imported, {report.failed} rows skipped.")
+    else:
+        form = NumberImportForm()
+
+    return render(request, "number/import_numbers.html", {
+        "form": form,
+        "client": client,
+        "report": report,
+    })
+
+
 def number_search(request, client_id):
 
     client = get_object_or_404(Client, id=client_id)
-    numbers = Number.objects.filter(client=client).select_related("operator")
+    numbers = Number.objects.filter(client=client).select_related("operator", "handler")
 
     search = request.GET.get("search", "")
     operator_id = request.GET.get("operator", "")
 
     if search:
-        numbers = numbers.filter(number__icontains=search)
+        numbers = numbers.search_digits(search)
 
     if operator_id:
         numbers = numbers.filter(operator_id=operator_id)
@@ -427,7 +417,7 @@ def number_search(request, client_id):
 
 @login_required(login_url='login')
 def number_detail(request, number_id):
-    number = get_object_or_404(Number, id=number_id)
+    number = get_object_or_404(Number.objects.select_related("operator", "client"), id=number_id)
 
     # Initial load, htmx will replace the table body
     return render(request, 'number/number_detail.html', {
@@ -438,7 +428,7 @@ def number_detail(request, number_id):
 
 @login_required(login_url='login')
 def edit_number(request, number_id):
-    number = get_object_or_404(Number, id=number_id)
+    number = get_object_or_404(Number.objects.select_related("client"), id=number_id)
 
     if request.method == "POST":
         form = AddNumberForm(request.POST, instance=number, client=number.client)
@@ -459,42 +449,68 @@ def number_page(request):
     return render(request, "number/number.html")
 
 
-def normalize_number(raw):
-    raw = str(raw).strip()
-
-    # +63XXXXXXXXXX → remove +63
-    if raw.startswith("+63"):
-        raw = raw[3:]
+NUMBER_RESULTS_PAGE_SIZE = 25
+NUMBER_RESULTS_MAX_PAGE_SIZE = 100
+NUMBER_RESULTS_COUNT_CAP = 1000    # "1000+" instead of counting every match
 
-    # 09XXXXXXXXX → drop leading 0
-    if raw.startswith("0") and len(raw) == 11:
-        raw = raw[1:]
 
-    return raw
+def plan_number_results(user, params):
+    """
+    Page query, bounded count query (first page only, else None) and a
+    finish(rows, total) -> (template, context) for the number search results.
+    Shared by the sync and async views; nothing is queried here.
+    """
+    query = params.get("q", "").strip()
 
+    try:
+        size = int(params.get("size", NUMBER_RESULTS_PAGE_SIZE))
+    except ValueError:
+        size = NUMBER_RESULTS_PAGE_SIZE
+    size = max(1, min(size, NUMBER_RESULTS_MAX_PAGE_SIZE))
+
+    # ⬅ default: all numbers from this user's clients, otherwise the digit search
+    results = Number.objects.filter(client__user_client=user)
+    if query:
+        results = results.search_digits(query)
+
+    # Keyset on the unique number column: "load more" sends back the last number shown
+    after = params.get("after", "")
+    page = results.select_related("client", "operator").order_by("number")
+    if after.isdigit():
+        page = page.filter(number__gt=int(after))
+
+    # Bounded count: stops scanning after NUMBER_RESULTS_COUNT_CAP + 1 rows
+    count_query = None if after else results.order_by()[:NUMBER_RESULTS_COUNT_CAP + 1]
+
+    def finish(rows, total):
+        has_next = len(rows) > size
+        rows = rows[:size]
+
+        context = {
+            "results": rows,
+            "query": query,
+            "size": size,
+            "next_cursor": rows[-1].number if has_next else None,
+        }
 
+        if after:
+            # Appended below the existing cards
+            return "number/partials/number_result_rows.html", context
 
-def search_number_page(request):
-    query = request.GET.get("q", "").strip()
+        context["total"] = min(total, NUMBER_RESULTS_COUNT_CAP)
+        context["total_capped"] = total > NUMBER_RESULTS_COUNT_CAP
+        return "number/partials/number_results.html", context
 
-    if query == "":
-        # ⬅ default: list all numbers from this user's clients
-        results = Number.objects.filter(
-            client__user_client=request.user
-        ).select_related("client", "operator")
+    return page[:size + 1], count_query, finish
 
-    else:
-        # ⬅ perform search
-        normalized = normalize_number(query)
 
-        results = Number.objects.filter(
-            number__icontains=normalized,
-            client__user_client=request.user
-        ).select_related("client", "operator")
+@login_required(login_url='login')
+def search_number_page(request):
+    page, count_query, finish = plan_number_results(request.user, request.GET)
 
-    return render(request, "number/partials/number_results.html", {
-        "results": results
-    })
+    total = count_query.count() if count_query is not None else None
+    template, context = finish(list(page), total)
+    return render(request, template, context)
 
 
 @login_required(login_url='login')
@@ -568,200 +584,69 @@ def add_payment(request, number_id):
     })
 
 
-def build_history_queryset(number):
-    # Convert invoices
-    invoice_entries = [
-        {
-            "type": "Invoice",
-            "time": inv.time,
-            "amount": inv.balance,
-            "reference": inv.reference_number,
-        }
-        for inv in number.invoices.all()
-    ]
-
-    # Convert payments
-    payment_entries = [
-        {
-            "type": "Payment",
-            "time": pay.time,
-            "amount": pay.paid_amount,
-            "reference": "",
-        }
-        for pay in number.payments.all()
-    ]
-
-    return invoice_entries + payment_entries
-
-
 def hx_history_table(request, number_id):
     number = get_object_or_404(Number, id=number_id)
-    history = build_history_queryset(number)
-
-    # --- SEARCH ---
-    search = request.GET.get('search', '').strip()
-    if search:
-        history = [h for h in history if search.lower() in str(h['reference']).lower() or search.lower() in str(h['time']).lower()]
-
-    # --- SORT ---
-    sort = request.GET.get('sort', 'time_desc')
-    reverse = True
-    key = 'time'
-
-    if sort == 'time_asc':
-        reverse = False
-    elif sort == 'amount_desc':
-        key = 'amount'
-    elif sort == 'amount_asc':
-        key = 'amount'
-        reverse = False
-    elif sort == 'type_asc':
-        key = 'type'
-        reverse = False
-    elif sort == 'type_desc':
-        key = 'type'
-        reverse = True
-
-    history = sorted(history, key=lambda x: x[key], reverse=reverse)
-
-    # --- PAGINATION ---
-    page_number = request.GET.get("page", 1)
-    paginator = Paginator(history, 10)
-    page_obj = paginator.get_page(page_number)
 
+    query, finish = plan_history_page(number, request.GET)
     return render(request, 'payments/payment_invoice_history.html', {
-        'page_obj': page_obj,
-        'sort': sort,
-        'search': search,
+        **finish(list(query)),
         'number': number,              # ➜ added
     })
 
 
 def print_number_history(request, number_id, start, end):
-    number = get_object_or_404(Number, id=number_id)
+    number = get_object_or_404(Number.objects.select_related("client"), id=number_id)
 
     # ---- Convert strings to datetime ----
     try:
         start_date = datetime.strptime(start, "%Y-%m-%d")
         end_date = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-    except:
+    except ValueError:
         return HttpResponse("Invalid date format. Use YYYY-MM-DD")
 
     start_date = timezone.make_aware(start_date)
     end_date = timezone.make_aware(end_date)
 
-    # ---- Build history ----
-    history = build_history_queryset(number)
-    filtered = [h for h in history if start_date <= h["time"] <= end_date]
-
-    # ---- Sort chronologically ----
-    filtered = sorted(filtered, key=lambda h: h["time"])
-
     # ---- PDF response ----
     response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = f'inline; filename="history-{number.number}.pdf"'
 
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=letter,
-        leftMargin=40,
-        rightMargin=40,
-        topMargin=40,       # reduced padding
-        bottomMargin=40
-    )
-
-    styles = getSampleStyleSheet()
-    title_style = styles["Heading1"]
-    title_style.fontSize = 18
-    title_style.leading = 22
-    title_style.spaceAfter = 12
-
-    subtitle_style = styles["Normal"]
-    subtitle_style.fontSize = 11
-    subtitle_style.leading = 14
-    subtitle_style.spaceAfter = 6
-
-    elements = []
-
-    # ---- Load logo ----
-    logo_path = finders.find("images/logo.png")
-    if logo_path:
-        img = Image(logo_path, width=120, height=45)  # resize as needed
-        elements.append(img)
-        elements.append(Spacer(1, 8))
-
-
-    # ---- Header Info (Option A) ----
-    elements.append(Paragraph("History Report", title_style))
-
-    client_name = number.client.name
-    trade_name = number.client.trade_name
-
-    header_html = f"""
-        <b>Client Name:</b> {client_name}<br/>
-        <b>Trade Name:</b> {trade_name}<br/>
-        <b>Number:</b> {number.number}<br/>
-        <b>Date Range:</b> {start} → {end}<br/>
-    """
-
-    elements.append(Paragraph(header_html, subtitle_style))
-    elements.append(Spacer(1, 12))
-
-    # ---- Table data ----
-    table_data = [["Time", "Type", "Amount", "Reference"]]
-
-    for h in filtered:
-        time_str = (
-            h["time"]
-            .astimezone(timezone.get_current_timezone())
-            .strftime("%Y-%m-%d %H:%M")
-        )
-
-        table_data.append([
-            time_str,
-            h["type"],
-            f"{h['amount']}",
-            h["reference"],
-        ])
-
-    # ---- Table styling ----
-    table = Table(table_data, repeatRows=1,
-        colWidths=[130, 90, 80, 200]
-    )
-
-    style = TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.Color(0.9, 0.9, 0.9)),
-        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ("FONTSIZE", (0,0), (-1,-1), 10),
-        ("TEXTCOLOR", (0,0), (-1,0), colors.black),
-
-        ("ALIGN", (0,0), (-1,-1), "CENTER"),
-        ("ALIGN", (2,1), (2,-1), "RIGHT"),
-
-        ("GRID", (0,0), (-1,-1), 0.4, colors.grey),
-
-        ("TOPPADDING", (0,0), (-1,0), 10),
-        ("BOTTOMPADDING", (0,0), (-1,0), 10),
-        ("TOPPADDING", (0,1), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,1), (-1,-1), 6),
-    ])
+    render_statement(number, start_date, end_date, response, start_label=start, end_label=end)
 
-    # ---- Color rows based on type ----
-    for i, h in enumerate(filtered, start=1):  # row 0 = header
-        t = h["type"].lower()
+    return response
 
-        if t == "invoice":
-            style.add("BACKGROUND", (0, i), (-1, i), colors.Color(1, 0.88, 0.88))  # light red
-        elif t == "payment":
-            style.add("BACKGROUND", (0, i), (-1, i), colors.Color(0.88, 1, 0.88))  # light green
 
-    table.setStyle(style)
+@user_passes_test(lambda user: user.is_staff, login_url='login')
+def request_stats_page(request):
+    # Aggregates from clientside.middleware for this worker process only
+    if request.method == "POST" and request.POST.get("reset"):
+        request_stats.reset()
+        dashboard_cache_stats.reset()
+        return redirect("request-stats")
+
+    return render(request, "stats/request_stats.html", {
+        "enabled": settings.REQUEST_TIMING,
+        "rows": request_stats.snapshot(),
+        "since": datetime.fromtimestamp(request_stats.since, tz=timezone.get_current_timezone()),
+        "pid": os.getpid(),
+        "dashboard_cache": dashboard_cache_stats.snapshot(),
+    })
 
-    elements.append(table)
 
-    # ---- Build PDF ----
-    doc.build(elements)
-
-    return response
+@user_passes_test(lambda user: user.is_staff, login_url='login')
+def query_reports_page(request):
+    # Recent per-request reports from the query inspector, this worker process only
+    if request.method == "POST" and request.POST.get("clear"):
+        query_reports.clear()
+        return redirect("query-reports")
 
+    reports = query_reports.all()
+    if request.GET.get("flagged"):
+        reports = [r for r in reports if r["repeated"] or r["slow"]]
 
+    return render(request, "stats/query_reports.html", {
+        "enabled": settings.QUERY_INSPECTOR,
+        "reports": [(report, format_report(report)) for report in reports],
+        "flagged": bool(request.GET.get("flagged")),
+        "pid": os.getpid(),
+    })
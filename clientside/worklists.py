@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import Number, WorklistEntry
+
+
+# Collection worklists: the dashboard rows for a collection day.
+# WorklistEntry holds one precomputed row per active number. build_worklists
+# rebuilds the upcoming days nightly and clientside.signals refresh single
+# numbers as the ledger, numbers, clients and handlers change.
+
+WORKLIST_DAYS_BEHIND = 1     # dashboard "prev"
+WORKLIST_DAYS_AHEAD = 1      # dashboard "next"
+
+WORKLIST_FIELDS = [
+    "number_id", "phone_number", "client_name", "trade_name",
+    "handler_name", "address_label", "due_balance",
+]
+
+
+def address_label(barangay, municipality):
+    return ", ".join(part for part in (barangay, municipality) if part)
+
+
+def worklist_days(today, behind=WORKLIST_DAYS_BEHIND, ahead=WORKLIST_DAYS_AHEAD):
+    # Collection day names from `behind` days ago to `ahead` days from now
+    return list(dict.fromkeys(
+        (today + timedelta(days=offset)).strftime("%A") for offset in range(-behind, ahead + 1)
+    ))
+
+
+def worklist_rows(numbers):
+    """
+    Dashboard rows (dicts keyed like WORKLIST_FIELDS, plus user / client / day)
+    computed live from Numbers annotated with due_balance.
+    """
+    rows = numbers.order_by("client__trade_name", "number").values(
+        "collection_day",
+        "client_id",
+        "due_balance",
+        number_id=F("id"),
+        phone_number=F("number"),
+        user_id=F("client__user_client_id"),
+        client_name=F("client__name"),
+        trade_name=F("client__trade_name"),
+        handler_name=F("handler__name"),
+        barangay=F("client__primary_address__barangay__name"),
+        municipality=F("client__primary_address__municipality__name"),
+    )
+    for row in rows:
+        row["address_label"] = address_label(row.pop("barangay"), row.pop("municipality"))
+        yield row
+
+
+def refresh_worklists(numbers):
+    """
+    Replace the WorklistEntry rows of ``numbers`` (a Number queryset).
+    Inactive numbers simply lose their row.
+    """
+    with transaction.atomic():
+        WorklistEntry.objects.filter(number__in=numbers.values("pk")).delete()
+        entries = [
+            WorklistEntry(
+                number_id=row["number_id"],
+                user_id=row["user_id"],
+                client_id=row["client_id"],
+                collection_day=row["collection_day"],
+                phone_number=row["phone_number"],
+                client_name=row["client_name"],
+                trade_name=row["trade_name"],
+                handler_name=row["handler_name"],
+                address_label=row["address_label"],
+                due_balance=row["due_balance"],
+            )
+            for row in worklist_rows(numbers.filter(sim_status="Active").with_due_balance("stored"))
+        ]
+        WorklistEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def dashboard_worklist(user, selected_day, show_all):
+    """Rows for the dashboard cards, from WorklistEntry or live per DASHBOARD_BALANCE_SOURCE."""
+    if settings.DASHBOARD_BALANCE_SOURCE == "worklist":
+        rows = WorklistEntry.objects.filter(
+            user=user, collection_day=selected_day
+        ).order_by("trade_name", "phone_number")
+        if not show_all:
+            rows = rows.filter(due_balance__gt=0)
+        return list(rows.values(*WORKLIST_FIELDS))
+
+    numbers = Number.objects.filter(
+        client__user_client=user,
+        sim_status="Active",
+        collection_day=selected_day
+    ).with_due_balance(settings.DASHBOARD_BALANCE_SOURCE)
+
+    # Filter positive balance only unless show_all is ON
+    if not show_all:
+        numbers = numbers.filter(due_balance__gt=0)
+    return list(worklist_rows(numbers))
@@ -0,0 +1,50 @@
+"""
+Gunicorn settings for LoadTracker, read automatically from the project root.
+
+    gunicorn LoadTracker.wsgi                                   # sync views, gthread workers
+    GUNICORN_WORKER_CLASS=asgi gunicorn LoadTracker.asgi        # async partials, uvicorn workers
+
+run.sh wraps both. Every value can be overridden from the environment; the
+defaults are the tuned profile for a small branch-office box talking to a
+remote PostgreSQL through pgBouncer. Reload code and settings gracefully with
+`kill -HUP $(cat gunicorn.pid)` (or `./run.sh reload`): new workers start
+before the old ones finish their in-flight requests.
+"""
+import multiprocessing
+import os
+
+
+# Same address runserver used; put a proxy in front or set GUNICORN_BIND to expose it
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+pidfile = os.getenv("GUNICORN_PIDFILE", "gunicorn.pid")
+
+# One process per core; requests mostly wait on the database, and the threads cover
+# that. More processes than cores only compete for the CPU (see the README benchmark).
+# Workers share state only through the database and CACHES, which must therefore be
+# a cross-process backend (the file cache in settings), never LocMemCache.
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 8)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# GUNICORN_WORKER_CLASS=asgi selects the uvicorn worker for LoadTracker.asgi
+# (the uvicorn-worker package; uvicorn.workers is deprecated)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "asgi":
+    worker_class = "uvicorn_worker.UvicornWorker"
+
+# Kill a request stuck longer than this (statement PDFs are the slowest page)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# Time given to in-flight requests on reload / shutdown
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then so a slow leak cannot grow without bound
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Not preloaded: each worker imports the app itself, so HUP picks up new code
+preload_app = False
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = os.getenv("GUNICORN_ERRORLOG", "-")
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
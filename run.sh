@@ -1,16 +1,37 @@
 #!/bin/bash
 
+# Start LoadTracker
+#   ./run.sh          gunicorn + LoadTracker.wsgi (workers, threads, timeouts in gunicorn.conf.py)
+#   ./run.sh asgi     gunicorn + uvicorn workers + LoadTracker.asgi (async htmx partials)
+#   ./run.sh reload   graceful reload of the running server after a deploy
+#   ./run.sh dev      Django development server (single process, auto-reload)
+
 # Go to your Django project folder
 cd /FULL/PATH/TO/YOUR/PROJECT || exit
 
 # Activate venv (optional — if you use one)
 # source venv/bin/activate
 
-# Run Django server
-python manage.py runserver
+case "${1:-wsgi}" in
+    wsgi)
+        DEBUG="${DEBUG:-False}" exec gunicorn LoadTracker.wsgi
+        ;;
+    asgi)
+        DEBUG="${DEBUG:-False}" GUNICORN_WORKER_CLASS=asgi exec gunicorn LoadTracker.asgi
+        ;;
+    reload)
+        kill -HUP "$(cat "${GUNICORN_PIDFILE:-gunicorn.pid}")"
+        ;;
+    dev)
+        python manage.py runserver
+        ;;
+    *)
+        echo "usage: $0 [wsgi|asgi|reload|dev]" >&2
+        exit 1
+        ;;
+esac
 
 
 
 # Make it executable
 # chmod +x ~/Desktop/run_django.sh
-